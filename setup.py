@@ -28,7 +28,15 @@ setup(
         "Operating System :: MacOS",
         "License :: OSI Approved :: MIT License",
     ],
-    install_requires=["numpy", "matplotlib", "snewpy", "plotly", "kaleido"],
+    install_requires=[
+        "numpy",
+        "matplotlib",
+        "snewpy",
+        "plotly",
+        "kaleido",
+        "pyarrow",
+        "h5py",
+    ],
     extras_require={"dev": ["pytest", "sphinx", "sphinx-rtd-theme",]},
     entry_points={"console_scripts": ["sspike=sspike.sspike:main"]},
 )
@@ -2,21 +2,37 @@
 
 Make plots and tables of pnut outputs.
 """
-import matplotlib.pyplot as plt
-from matplotlib import rcParams
-import plotly.express as px
+from functools import lru_cache
+
 import pandas as pd
 import numpy as np
 
-from . import pnut
+from . import pnut, cube
 from .core.logging import getLogger
 
 log = getLogger(__name__)
 
-rcParams["font.family"] = "sans-serif"
-rcParams["font.sans-serif"] = ["Times"]
-rcParams["font.size"] = 22
-rcParams["legend.fontsize"] = 18
+
+@lru_cache(maxsize=None)
+def _pyplot():
+    """matplotlib.pyplot with sspike styling, imported on first plot."""
+    import matplotlib.pyplot as plt
+    from matplotlib import rcParams
+
+    rcParams["font.family"] = "sans-serif"
+    rcParams["font.sans-serif"] = ["Times"]
+    rcParams["font.size"] = 22
+    rcParams["legend.fontsize"] = 18
+
+    return plt
+
+
+@lru_cache(maxsize=None)
+def _express():
+    """plotly.express, imported on first bar graph."""
+    import plotly.express as px
+
+    return px
 
 
 def plot_luminosities(sn, lum=None, save=True, show=True):
@@ -33,6 +49,7 @@ def plot_luminosities(sn, lum=None, save=True, show=True):
     show : bool, default True
         Display plot.
     """
+    plt = _pyplot()
     if lum is None:
         lum = pnut.get_luminosities(sn)
 
@@ -73,6 +90,7 @@ def plot_fluences(sn, index=0, cut=0, save=True, show=True):
     show : bool, default True
         Display plot.
     """
+    plt = _pyplot()
     flu = pnut.get_fluences(sn, index=index)
 
     time = sn.t_end - sn.t_start
@@ -118,6 +136,7 @@ def plot_snowglobes_events(
     show : bool, default True
         Display plot.
     """
+    plt = _pyplot()
     log.debug("\nPlotting SNOwGLoBES events.\n")
     snow_events = pnut.snowglobes_events(sn, detector, index)
 
@@ -170,6 +189,7 @@ def plot_sspike_events(sn, detector, index=0, save=True, show=True):
     show : bool, default True
         Display plot.
     """
+    plt = _pyplot()
     sspike_events = pnut.sspike_events(sn, detector, index)
 
     title = f"{sn.sn_name} @ {sn.distance} kpc in {detector.name}"
@@ -223,6 +243,7 @@ def bar_totals(sn, detector, index=0, save=True, show=True):
     show : bool, default True
         Display plot.
     """
+    px = _express()
     totals = pnut.event_totals(sn, detector, index)
 
     title = f"{sn.sn_name} @ {sn.distance} kpc in {detector.name}"
@@ -266,6 +287,7 @@ def bar_vis(sn, detector, index=0, save=True, show=True):
     show : bool, default True
         Display plot.
     """
+    px = _express()
     vis = pnut.vis_totals(sn, detector, index)
 
     title = f"{sn.sn_name} @ {sn.distance} kpc in {detector.name}"
@@ -302,6 +324,7 @@ def plot_series(sn, detector, save=True, show=True):
     show : bool, default True
         Display plot.
     """
+    plt = _pyplot()
     totals = pd.read_csv(f"{detector.get_save_dir(sn)}/chan_time.csv", sep=" ")
 
     channels = list(totals.keys())[1:]
@@ -348,6 +371,7 @@ def plot_N_chan(sn, detector, chan, events=False, save=True, show=True):
     show : bool, default True
         Display plot.
     """
+    plt = _pyplot()
     save_dir = detector.get_save_dir(sn)
 
     if chan == "random":
@@ -356,10 +380,11 @@ def plot_N_chan(sn, detector, chan, events=False, save=True, show=True):
 
     else:
         title = f"{chan} rates"
-        N_chan = pd.read_csv(f"{save_dir}/N_{chan}.csv", sep=" ", index_col=0)
+        N_chan = cube.read(f"{save_dir}/{cube.cube_name}", chan)
 
     times = N_chan.index.values
-    energy = pnut.snow_energy()
+    # Neutrino energies for SNOwGLoBES channels, recoil energies for nc_*_p.
+    energy = N_chan.columns.values.astype(float)
     t0, t1 = times[0], times[-1]
     e0, e1 = energy[0] * 1e3, energy[-1] * 1e3
 
@@ -407,6 +432,7 @@ def plot_distance_rates(sn, detector, save=True, show=True):
     show : bool, default True
         Display plot.
     """
+    plt = _pyplot()
     vis = pnut.vis_totals(sn, detector)
 
     x = np.arange(0.1, 1e2, 0.1)
@@ -0,0 +1,290 @@
+"""SQLite catalog of completed simulation stages.
+
+`stages.run_stages` adds a row for every stage it completes, so what exists
+for a sweep is one indexed query instead of a walk of the output directories:
+
+    sspike catalog sims.json --missing
+
+Each row has the stage node key (`stages.Stage.key`), the run parameters in
+the stage scope, the output location, hashes of the inputs, the sspike
+version, and the run time and output size.
+"""
+from argparse import ArgumentParser
+from contextlib import closing
+from os import walk
+from os.path import getsize, isdir, isfile
+from time import time
+import json
+import sqlite3
+
+from .env import sspike_dir
+from ._version import __version__
+
+catalog_file = f"{sspike_dir}/catalog.sqlite"
+
+schema = """
+CREATE TABLE IF NOT EXISTS stages (
+    key TEXT PRIMARY KEY,
+    stage TEXT NOT NULL,
+    model TEXT NOT NULL,
+    progenitor TEXT NOT NULL,
+    transform TEXT,
+    distance REAL,
+    detector TEXT,
+    location TEXT,
+    inputs TEXT,
+    version TEXT NOT NULL,
+    finished REAL NOT NULL,
+    seconds REAL,
+    bytes INTEGER
+);
+CREATE INDEX IF NOT EXISTS stages_run ON stages (model, progenitor, stage);
+"""
+
+# Columns describing a completed stage, in table order.
+columns = [
+    "key",
+    "stage",
+    "model",
+    "progenitor",
+    "transform",
+    "distance",
+    "detector",
+    "location",
+    "inputs",
+    "version",
+    "finished",
+    "seconds",
+    "bytes",
+]
+
+
+def connect(path=catalog_file):
+    """Open the catalog, creating it if needed.
+
+    Write-ahead logging lets sweep workers add rows while others read.
+    """
+    conn = sqlite3.connect(path, timeout=60)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(schema)
+
+    return conn
+
+
+def record(key, stage, params, location, inputs, seconds, path=catalog_file):
+    """Add or replace the row of a completed stage node.
+
+    Parameters
+    ----------
+    key : str
+        Node key from `stages.Stage.key`.
+    stage : str
+        Stage name.
+    params : dict
+        Run parameters in the stage scope (see `stages.scopes`).
+    location : list of str
+        Output files and directories of the stage.
+    inputs : dict
+        Hashes of the stage inputs.
+    seconds : float
+        Run time of the stage.
+    path : str, default catalog_file
+        Catalog database.
+    """
+    row = {
+        "key": key,
+        "stage": stage,
+        "model": params["model"],
+        "progenitor": json.dumps(params["progenitor"], sort_keys=True),
+        "transform": params.get("transform"),
+        "distance": params.get("distance"),
+        "detector": params.get("detector"),
+        "location": json.dumps(location),
+        "inputs": json.dumps(inputs, sort_keys=True),
+        "version": __version__,
+        "finished": time(),
+        "seconds": seconds,
+        "bytes": sum(_size(p) for p in location),
+    }
+    values = [row[column] for column in columns]
+    insert = f"INSERT OR REPLACE INTO stages VALUES ({', '.join('?' * len(values))})"
+    with closing(connect(path)) as conn, conn:
+        conn.execute(insert, values)
+
+
+def completed(keys, path=catalog_file, inputs=None):
+    """Keys of stage nodes completed by this sspike version.
+
+    Parameters
+    ----------
+    keys : iterable of str
+        Node keys from `stages.Stage.key`.
+    path : str, default catalog_file
+        Catalog database.
+    inputs : dict of dict, optional
+        Current input hashes by node key (`stages.node_inputs`).  Nodes
+        recorded with other inputs, or whose outputs are missing, are not
+        completed.
+
+    Returns
+    -------
+    done : set of str
+        The subset of `keys` in the catalog.
+    """
+    rows = _select(keys, ["inputs", "location"], path)
+    if inputs is None:
+        return set(rows)
+
+    return {key for key, row in rows.items() if _current(*row, inputs[key])}
+
+
+def status(runs, until=None, path=catalog_file, inputs=None):
+    """Which stage nodes of a sweep exist and which are missing.
+
+    Parameters
+    ----------
+    runs : list of tuple
+        (model, progenitor, transform, distance, detector) for each run.
+    until : str, optional
+        Final stage.  All stages if None.
+    path : str, default catalog_file
+        Catalog database.
+    inputs : dict of dict, optional
+        Current input hashes by node key, as for `completed`.  From
+        `stages.node_inputs` if None.
+
+    Returns
+    -------
+    df : pd.DataFrame
+        One row per node of `stages.plan` with its stage, run parameters,
+        "done", and the catalog location, run time, and size if done.
+    """
+    import pandas as pd
+    from .stages import plan, stages, scopes, run_keys, node_inputs
+
+    nodes = plan(runs, until)
+    fields = ["location", "seconds", "bytes", "inputs"]
+    rows = _select([key for key, _, _ in nodes], fields, path)
+    if inputs is None:
+        inputs = node_inputs(nodes)
+    rows = {
+        key: row for key, row in rows.items() if _current(row[3], row[0], inputs[key])
+    }
+
+    records = []
+    for key, name, run in nodes:
+        params = dict(zip(run_keys, run))
+        scope = scopes[stages[name].scope]
+        record = {"stage": name}
+        for param in run_keys:
+            record[param] = params[param] if param in scope else None
+        location, seconds, size, _ = rows.get(key, (None, None, None, None))
+        record["done"] = key in rows
+        record["location"] = json.loads(location) if location else None
+        record["seconds"] = seconds
+        record["bytes"] = size
+        records.append(record)
+
+    return pd.DataFrame(records)
+
+
+def forget(keys, path=catalog_file):
+    """Remove stage nodes from the catalog so they run again.
+
+    Parameters
+    ----------
+    keys : iterable of str
+        Node keys from `stages.Stage.key`.
+    path : str, default catalog_file
+        Catalog database.
+    """
+    if not isfile(path):
+        return
+    with closing(connect(path)) as conn, conn:
+        conn.executemany("DELETE FROM stages WHERE key = ?", [[key] for key in keys])
+
+
+def _select(keys, fields, path):
+    """Fields of the current version rows of `keys`, by key."""
+    keys = list(keys)
+    rows = {}
+    if not keys or not isfile(path):
+        return rows
+
+    with closing(connect(path)) as conn:
+        # Stay below SQLite's limit on query parameters.
+        for i in range(0, len(keys), 500):
+            chunk = keys[i : i + 500]
+            query = (
+                f"SELECT {', '.join(['key'] + fields)} FROM stages "
+                f"WHERE version = ? AND key IN ({', '.join('?' * len(chunk))})"
+            )
+            for row in conn.execute(query, [__version__, *chunk]):
+                rows[row[0]] = row[1:]
+
+    return rows
+
+
+def _current(inputs, location, expected):
+    """Whether a row has the `expected` inputs and all of its outputs."""
+    if json.loads(inputs or "{}") != expected:
+        return False
+
+    return all(isfile(p) or isdir(p) for p in json.loads(location or "[]"))
+
+
+def _size(path):
+    """Bytes in a file or directory tree, 0 if it does not exist."""
+    if isfile(path):
+        return getsize(path)
+    if not isdir(path):
+        return 0
+
+    return sum(
+        getsize(f"{folder}/{name}") for folder, _, names in walk(path) for name in names
+    )
+
+
+def main(args=None):
+    """Command-line entry-point for `sspike catalog`.
+
+    Parameters
+    ----------
+    args : list of str, optional
+        Command line arguments after "catalog".
+
+    Returns
+    -------
+    int
+        Exit status, 1 with `--missing` if any stage is missing.
+    """
+    from .stages import plan, stages
+    from .sspike import read_runs
+
+    parser = ArgumentParser(
+        prog="sspike catalog", description="list completed and missing stages"
+    )
+    parser.add_argument("file", help="file path to simulations dictionary")
+    parser.add_argument(
+        "-u", "--until", choices=list(stages), metavar="", help="last stage"
+    )
+    parser.add_argument(
+        "--missing", action="store_true", help="only list stages not yet run"
+    )
+    parser.add_argument(
+        "--forget", action="store_true", help="remove the sweep so it runs again"
+    )
+    cmdline = parser.parse_args(args)
+
+    runs = read_runs(cmdline.file)
+    if cmdline.forget:
+        forget([key for key, _, _ in plan(runs, cmdline.until)])
+
+    df = status(runs, cmdline.until)
+    missing = (~df["done"]).sum()
+    if cmdline.missing:
+        df = df[~df["done"]]
+    print(df.drop(columns="location").to_string(index=False))
+    print(f"{len(df.index)} stages listed, {missing} missing.")
+
+    return int(cmdline.missing and missing > 0)
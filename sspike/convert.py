@@ -0,0 +1,210 @@
+"""Convert snewpy model files to one memory-mapped layout.
+
+Every supported model format (FITS, HDF5, text) is evaluated once through
+snewpy and saved as NumPy arrays:
+
+- time : model sample times [s]
+- energy : neutrino energies [MeV], the 0.2 MeV grid used for fluences
+- spectra : initial spectra [erg^-1 s^-1], shape (time, flavor, energy)
+- luminosity : luminosities [erg s^-1], shape (time, flavor), if available
+
+`pnut.load_model` returns a `StoredModel` for converted files.
+"""
+from argparse import ArgumentParser
+from os.path import basename, getmtime, getsize
+import json
+import itertools
+
+import numpy as np
+from astropy import units
+import snewpy.models.ccsn
+from snewpy.models.base import SupernovaModel
+from snewpy.neutrino import Flavor
+
+from .env import cache_dir
+from .core.cache import save_arrays, load_arrays
+from .core.logging import getLogger
+
+log = getLogger(__name__)
+
+# Energies [MeV] of converted spectra, the same grid as snewpy fluences.
+store_energy = np.linspace(0, 100, 501)
+
+
+class StoredModel(SupernovaModel):
+    """snewpy model backed by arrays written by `convert`.
+
+    Parameters
+    ----------
+    path : str
+        Directory of the converted model.
+
+    Attributes
+    ----------
+    time : astropy.Quantity
+        Model sample times.
+    luminosity : dict of astropy.Quantity
+        Luminosity of each flavor, if the source model had them.
+    spectra : np.memmap
+        Initial spectra [erg^-1 s^-1], shape (time, flavor, energy).
+    energy : np.memmap
+        Energies [MeV] of `spectra`.
+    """
+
+    def __init__(self, path):
+        arrays, meta = load_arrays(path)
+        super().__init__(arrays["time"] * units.s, meta)
+        self.filename = meta.get("source")
+        self.spectra = arrays["spectra"]
+        self.energy = arrays["energy"]
+        self.luminosity = {}
+        if "luminosity" in arrays:
+            for k, flavor in enumerate(Flavor):
+                lum = arrays["luminosity"][:, k]
+                self.luminosity[flavor] = lum * units.erg / units.s
+
+    def get_initial_spectra(self, t, E, flavors=Flavor):
+        """Spectra interpolated linearly in time and energy.
+
+        Parameters
+        ----------
+        t : astropy.Quantity
+            Time to evaluate initial spectra.
+        E : astropy.Quantity or ndarray of astropy.Quantity
+            Energies to evaluate the initial spectra.
+        flavors: iterable of snewpy.neutrino.Flavor
+            Return spectra for these flavors only (default: all).
+
+        Returns
+        -------
+        initialspectra : dict
+            Dictionary of model spectra, keyed by neutrino flavor.
+        """
+        t_s = self.time.to_value(units.s)
+        t = units.Quantity(t, units.s).value
+        E = units.Quantity(E, units.MeV).value
+
+        # Exact at the model sample times.
+        j = int(np.clip(np.searchsorted(t_s, t) - 1, 0, len(t_s) - 2))
+        w = np.clip((t - t_s[j]) / (t_s[j + 1] - t_s[j]), 0, 1)
+        spectra = (1 - w) * self.spectra[j] + w * self.spectra[j + 1]
+
+        flavor_list = list(Flavor)
+        initialspectra = {}
+        for flavor in flavors:
+            spectrum = spectra[flavor_list.index(flavor)]
+            if not np.array_equal(E, self.energy):
+                spectrum = np.interp(E, self.energy, spectrum, left=0, right=0)
+            initialspectra[flavor] = spectrum / (units.erg * units.s)
+
+        return initialspectra
+
+
+def store_path(model, sim_file):
+    """Directory of the converted `sim_file` of a snewpy `model` type."""
+    return f"{cache_dir}/models/{model}/{basename(sim_file)}"
+
+
+def stored_model(model, sim_file):
+    """`StoredModel` for a model file if it was converted since last modified.
+
+    Parameters
+    ----------
+    model : str
+        Name of supernova model type from `snewpy`.
+    sim_file : str
+        Path to the simulation file.
+
+    Returns
+    -------
+    StoredModel or None
+        None if the file was not converted or changed after conversion.
+    """
+    path = store_path(model, sim_file)
+    try:
+        with open(f"{path}/arrays.json") as f:
+            meta = json.load(f)["meta"]
+    except FileNotFoundError:
+        return None
+
+    source = [meta.get("mtime"), meta.get("size")]
+    if source != [getmtime(sim_file), getsize(sim_file)]:
+        log.warning(f"\nIgnoring outdated conversion of {sim_file}.\n")
+        return None
+
+    return StoredModel(path)
+
+
+def convert(sn):
+    """Evaluate a supernova model file once and save it in the stored layout.
+
+    Parameters
+    ----------
+    sn : sspike.Supernova
+        Supernova whose `sim_file` is converted.
+
+    Returns
+    -------
+    path : str
+        Directory of the converted model.
+    """
+    log.info(f"\nConverting {sn.sim_file}.\n")
+    model = getattr(snewpy.models.ccsn, sn.model)(sn.sim_file)
+
+    time = model.get_time().to(units.s)
+    energy = store_energy * units.MeV
+    spectra = np.zeros((len(time), len(Flavor), len(energy)))
+    for j, t in enumerate(time):
+        spec = model.get_initial_spectra(t, energy)
+        for k, flavor in enumerate(Flavor):
+            spectra[j, k] = spec[flavor].to_value(1 / (units.erg * units.s))
+
+    arrays = {"time": time.value, "energy": store_energy, "spectra": spectra}
+    if hasattr(model, "luminosity"):
+        lum = [model.luminosity[flavor] for flavor in Flavor]
+        arrays["luminosity"] = np.stack(lum, axis=1).to_value(units.erg / units.s)
+
+    meta = {
+        "model": sn.model,
+        "source": sn.sim_file,
+        "mtime": getmtime(sn.sim_file),
+        "size": getsize(sn.sim_file),
+    }
+    path = store_path(sn.model, sn.sim_file)
+    save_arrays(path, arrays, meta)
+
+    return path
+
+
+def main(args=None):
+    """Command-line entry-point for `sspike convert`.
+
+    Parameters
+    ----------
+    args : list of str, optional
+        Command line arguments after "convert".
+
+    Returns
+    -------
+    int
+        Exit status.
+    """
+    parser = ArgumentParser(
+        prog="sspike convert",
+        description="convert supernova model files for fast loading",
+    )
+    parser.add_argument("file", help="file path to simulations dictionary")
+    cmdline = parser.parse_args(args)
+
+    # Supernova imports pnut, which loads converted models from this module.
+    from .supernova import Supernova
+
+    with open(cmdline.file, "r") as f:
+        info = json.load(f)
+
+    for sim in info["sim"]:
+        for model, progenitor in itertools.product(sim["model"], sim["progenitor"]):
+            sn = Supernova(model, progenitor, "NoTransformation", 10.0)
+            print(f"Converting {model} \t {progenitor}: {convert(sn)}")
+
+    return 0
@@ -0,0 +1,200 @@
+"""Content hashes and atomic array files for sspike caches."""
+from hashlib import sha256
+from os import makedirs, replace, rename
+from os.path import dirname, isdir
+from shutil import rmtree
+from tempfile import NamedTemporaryFile, mkdtemp
+import json
+
+import numpy as np
+import pandas as pd
+
+
+def digest(*parts):
+    """Hash arrays, numbers, and strings into a short hexadecimal key.
+
+    Parameters
+    ----------
+    *parts
+        Inputs identifying a cached result.  Arrays are hashed by dtype, shape
+        and contents; everything else by its `repr`.
+
+    Returns
+    -------
+    key : str
+        First 16 characters of the SHA-256 hex digest.
+    """
+    h = sha256()
+    for part in parts:
+        if isinstance(part, np.ndarray) or hasattr(part, "to_numpy"):
+            arr = np.ascontiguousarray(np.asarray(part))
+            h.update(f"{arr.dtype}{arr.shape}".encode())
+            h.update(arr.tobytes())
+        else:
+            h.update(repr(part).encode())
+        # Separator so that ("ab", "c") and ("a", "bc") differ.
+        h.update(b"\0")
+
+    return h.hexdigest()[:16]
+
+
+def file_digest(path):
+    """Hash the contents of a file.
+
+    Parameters
+    ----------
+    path : str
+        File to hash.
+
+    Returns
+    -------
+    key : str
+        First 16 characters of the SHA-256 hex digest of the file bytes.
+    """
+    h = sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+
+    return h.hexdigest()[:16]
+
+
+def save_npy(path, array):
+    """Write an array to `path` atomically.
+
+    The array is written to a temporary file in the same directory and then
+    renamed, so readers never see a partially written file.
+
+    Parameters
+    ----------
+    path : str
+        Destination `.npy` file.
+    array : np.array
+        Data to save.
+    """
+    folder = dirname(path)
+    if not isdir(folder):
+        makedirs(folder, exist_ok=True)
+    with NamedTemporaryFile(dir=folder, suffix=".tmp", delete=False) as tmp:
+        np.save(tmp, array)
+    replace(tmp.name, path)
+
+
+def load_npy(path):
+    """Memory-map a cached array read-only so processes share one copy.
+
+    Parameters
+    ----------
+    path : str
+        `.npy` file written by `save_npy`.
+
+    Returns
+    -------
+    array : np.memmap
+        Read-only view of the file.
+    """
+    return np.load(path, mmap_mode="r")
+
+
+def save_frames(path, frames):
+    """Publish DataFrames as a directory of CSV files atomically.
+
+    The files are written to a temporary directory next to `path` which is
+    then renamed, so a directory at `path` is always complete.  If another
+    process published `path` first, its copy is kept.
+
+    Parameters
+    ----------
+    path : str
+        Destination directory, usually named by a `digest` of the inputs.
+    frames : dict of pd.DataFrame
+        Tables to save, written as f"{path}/{name}.csv".
+    """
+    folder = dirname(path)
+    if not isdir(folder):
+        makedirs(folder, exist_ok=True)
+    tmp = mkdtemp(dir=folder, suffix=".tmp")
+    for name, df in frames.items():
+        df.to_csv(f"{tmp}/{name}.csv", sep=" ", index=False)
+    with open(f"{tmp}/frames.json", "w") as f:
+        json.dump(list(frames), f)
+
+    try:
+        rename(tmp, path)
+    except OSError:
+        if not isdir(path):
+            raise
+        rmtree(tmp, ignore_errors=True)
+
+
+def load_frames(path):
+    """Load DataFrames published by `save_frames`.
+
+    Parameters
+    ----------
+    path : str
+        Directory written by `save_frames`.
+
+    Returns
+    -------
+    frames : dict of pd.DataFrame
+        Tables in the order they were saved.
+    """
+    with open(f"{path}/frames.json") as f:
+        names = json.load(f)
+
+    return {name: pd.read_csv(f"{path}/{name}.csv", sep=" ") for name in names}
+
+
+def save_arrays(path, arrays, meta=None):
+    """Publish arrays as a directory of `.npy` files atomically.
+
+    Parameters
+    ----------
+    path : str
+        Destination directory.
+    arrays : dict of np.array
+        Arrays to save, written as f"{path}/{name}.npy".
+    meta : dict, optional
+        JSON-serializable information saved with the arrays.
+
+    Notes
+    -----
+    An existing directory at `path` is replaced.
+    """
+    folder = dirname(path)
+    if not isdir(folder):
+        makedirs(folder, exist_ok=True)
+    tmp = mkdtemp(dir=folder, suffix=".tmp")
+    for name, array in arrays.items():
+        np.save(f"{tmp}/{name}.npy", array)
+    with open(f"{tmp}/arrays.json", "w") as f:
+        json.dump({"arrays": list(arrays), "meta": meta or {}}, f)
+
+    if isdir(path):
+        old = mkdtemp(dir=folder, suffix=".old")
+        replace(path, f"{old}/arrays")
+        rmtree(old, ignore_errors=True)
+    rename(tmp, path)
+
+
+def load_arrays(path):
+    """Memory-map arrays published by `save_arrays`.
+
+    Parameters
+    ----------
+    path : str
+        Directory written by `save_arrays`.
+
+    Returns
+    -------
+    arrays : dict of np.memmap
+        Read-only arrays by name.
+    meta : dict
+        Information saved with the arrays.
+    """
+    with open(f"{path}/arrays.json") as f:
+        info = json.load(f)
+    arrays = {name: load_npy(f"{path}/{name}.npy") for name in info["arrays"]}
+
+    return arrays, info["meta"]
@@ -21,7 +21,8 @@ HOST = gethostname()
 
 log_date = date.today().strftime("%Y-%m-%d")
 log_file = f"/Users/joe/src/gitjoe/sspike/log/{log_date}.log"
-fh = FileHandler(log_file)
+# The log file is only opened when the first message is written to it.
+fh = FileHandler(log_file, delay=True)
 
 formatter = Formatter(
     f"%(asctime)s on {HOST}\n" f"  %(levelname)s [%(name)s] %(message)s",
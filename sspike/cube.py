@@ -0,0 +1,190 @@
+"""Chunked, compressed time x energy x channel count cubes.
+
+`pnut.time_events` saves the counts of every channel in one HDF5 file in the
+detector directory, with a group for each energy grid:
+
+    time_events.h5
+        snowglobes/  counts (time, energy, channel), time, energy, channels
+        elastic/     the same for proton elastic scattering (recoil energies)
+
+Each chunk holds a block of time bins of one channel, so `read` of a channel,
+time window, or energy range only decompresses the chunks it needs.  Groups
+grow along time with `append`, so counts can be saved as they are computed.
+"""
+import numpy as np
+import pandas as pd
+
+# File name of the cube in a detector directory.
+cube_name = "time_events.h5"
+# Time bins per chunk.
+chunk_times = 64
+
+
+def write(path, group, time, energy, channels, counts):
+    """Save counts of several channels as a group of a cube file.
+
+    Parameters
+    ----------
+    path : str
+        HDF5 file, created if missing.
+    group : str
+        Group name, replaced if it exists.
+    time : np.array
+        Time bin mid-points [s].
+    energy : np.array
+        Energy bins.
+    channels : list of str
+        Channel names.
+    counts : np.array
+        Events, shape (time, energy, channel).
+    """
+    create(path, group, energy, channels)
+    append(path, group, time, counts)
+
+
+def create(path, group, energy, channels):
+    """Start an empty group of a cube file for counts added by `append`.
+
+    Parameters
+    ----------
+    path : str
+        HDF5 file, created if missing.
+    group : str
+        Group name, replaced if it exists.
+    energy : np.array
+        Energy bins.
+    channels : list of str
+        Channel names.
+    """
+    import h5py
+
+    with h5py.File(path, "a") as f:
+        if group in f:
+            del f[group]
+        g = f.create_group(group)
+        g["energy"] = np.asarray(energy, dtype=float)
+        g["channels"] = np.array(channels, dtype=h5py.string_dtype())
+        g.create_dataset("time", shape=(0,), maxshape=(None,), dtype=float)
+        g.create_dataset(
+            "counts",
+            shape=(0, len(energy), len(channels)),
+            maxshape=(None, len(energy), len(channels)),
+            chunks=(chunk_times, len(energy), 1),
+            dtype=float,
+            compression="gzip",
+            shuffle=True,
+        )
+
+
+def append(path, group, time, counts):
+    """Add time bins to the end of a group of a cube file.
+
+    Parameters
+    ----------
+    path : str
+        HDF5 file written by `create` or `write`.
+    group : str
+        Group name.
+    time : np.array
+        Time bin mid-points [s] of the new bins.
+    counts : np.array
+        Events, shape (time, energy, channel).
+    """
+    import h5py
+
+    with h5py.File(path, "a") as f:
+        g = f[group]
+        n, k = len(g["time"]), len(time)
+        g["time"].resize((n + k,))
+        g["time"][n:] = time
+        g["counts"].resize(n + k, axis=0)
+        g["counts"][n:] = counts
+
+
+def groups(path):
+    """Channels of a cube file by group.
+
+    Parameters
+    ----------
+    path : str
+        HDF5 file written by `write`.
+
+    Returns
+    -------
+    channels : dict of list
+        Channel names in each group.
+    """
+    import h5py
+
+    with h5py.File(path, "r") as f:
+        return {name: list(f[name]["channels"].asstr()) for name in f}
+
+
+def read_group(path, group):
+    """Load a whole group of a cube file.
+
+    Parameters
+    ----------
+    path : str
+        HDF5 file written by `write`.
+    group : str
+        Group name.
+
+    Returns
+    -------
+    tuple
+        time, energy, channels, and counts as passed to `write`.
+    """
+    import h5py
+
+    with h5py.File(path, "r") as f:
+        g = f[group]
+        channels = list(g["channels"].asstr())
+        return g["time"][:], g["energy"][:], channels, g["counts"][:]
+
+
+def read(path, chan, t_range=None, e_range=None):
+    """Counts of one channel in a time window and energy range.
+
+    Parameters
+    ----------
+    path : str
+        HDF5 file written by `write`.
+    chan : str
+        Channel name.
+    t_range : (float, float), optional
+        Lowest and highest time bin mid-points [s] to load.  All if None.
+    e_range : (float, float), optional
+        Lowest and highest energies to load.  All if None.
+
+    Returns
+    -------
+    counts : pd.DataFrame
+        Events with times as index and energies as columns.
+    """
+    import h5py
+
+    with h5py.File(path, "r") as f:
+        for name in f:
+            channels = list(f[name]["channels"].asstr())
+            if chan in channels:
+                g = f[name]
+                break
+        else:
+            raise KeyError(f"Channel {chan} not found in {path}")
+
+        time, energy = g["time"][:], g["energy"][:]
+        t0, t1 = _bounds(time, t_range)
+        e0, e1 = _bounds(energy, e_range)
+        counts = g["counts"][t0:t1, e0:e1, channels.index(chan)]
+
+    return pd.DataFrame(counts, index=time[t0:t1], columns=energy[e0:e1])
+
+
+def _bounds(x, limits):
+    """Slice bounds of sorted `x` within inclusive `limits`."""
+    if limits is None:
+        return 0, len(x)
+    lo, hi = limits
+
+    return np.searchsorted(x, lo, side="left"), np.searchsorted(x, hi, side="right")
@@ -0,0 +1,169 @@
+"""Partitioned Parquet dataset of sspike results.
+
+Each kind of result table (e.g. "snow-smeared_weighted", "totals_vis") is a
+Hive-partitioned dataset under `env.dataset_dir`:
+
+    {table}/model=.../progenitor=.../transform=.../distance=.../bins=.../
+        detector=.../bin-{index}.parquet
+
+`read` combines the files of a table, loading only the requested columns
+and the partitions matching the filters:
+
+    vis = dataset.read(
+        "totals_vis",
+        columns=["progenitor", "channel", "events"],
+        filters=[("model", "==", "Nakazato_2013"), ("distance", "==", 10.0)],
+    )
+"""
+from os import listdir, makedirs, replace
+from os.path import dirname, isdir
+from tempfile import NamedTemporaryFile
+
+from .env import dataset_dir
+
+# Partition columns and their Arrow types, coarsest first.
+partition_types = {
+    "model": "string",
+    "progenitor": "string",
+    "transform": "string",
+    "distance": "float64",
+    "bins": "string",
+    "detector": "string",
+}
+
+
+def partition(sn, detector=None):
+    """Partition values of a result.
+
+    Parameters
+    ----------
+    sn : sspike.Supernova
+        Supernova simulation specifics.
+    detector : sspike.Detector, optional
+        Detector of the result.  Only the model and progenitor partitions are
+        used if None (e.g. for luminosities).
+
+    Returns
+    -------
+    values : dict
+        Partition column values, coarsest first.
+    """
+    values = {"model": sn.model, "progenitor": sn.sn_name}
+    if detector is not None:
+        values["transform"] = sn.transform
+        values["distance"] = float(sn.distance)
+        values["bins"] = sn.bin_name
+        values["detector"] = detector.name
+
+    return values
+
+
+def partition_dir(table, sn, detector=None, root=dataset_dir):
+    """Directory of the files of `table` for a result (see `partition`)."""
+    parts = [f"{column}={value}" for column, value in partition(sn, detector).items()]
+
+    return "/".join([root, table] + parts)
+
+
+def file_path(table, sn, detector=None, index=None, root=dataset_dir):
+    """Parquet file of a result written by `write`."""
+    name = "data" if index is None else f"bin-{index}"
+
+    return f"{partition_dir(table, sn, detector, root)}/{name}.parquet"
+
+
+def write(table, df, sn, detector=None, index=None, root=dataset_dir):
+    """Add a result table to the dataset, replacing an earlier copy.
+
+    Parameters
+    ----------
+    table : str
+        Dataset name, the kind of result.
+    df : pd.DataFrame
+        Result table.
+    sn : sspike.Supernova
+        Supernova simulation specifics.
+    detector : sspike.Detector, optional
+        Detector of the result.
+    index : int, optional
+        Time bin of the result, saved in a "bin" column.
+    root : str, default env.dataset_dir
+        Dataset location.
+
+    Returns
+    -------
+    path : str
+        Parquet file written.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    path = file_path(table, sn, detector, index, root)
+    folder = dirname(path)
+    makedirs(folder, exist_ok=True)
+    if index is not None:
+        df = df.assign(bin=index)
+    # Columns like "model" of `pnut.vis_totals` are read from the partitions.
+    df = df.drop(columns=[column for column in partition_types if column in df])
+
+    # Readers skip hidden files, so the temporary file is never read.
+    data = pa.Table.from_pandas(df, preserve_index=False)
+    with NamedTemporaryFile(dir=folder, prefix=".", suffix=".tmp", delete=False) as tmp:
+        pq.write_table(data, tmp, compression="zstd")
+    replace(tmp.name, path)
+
+    return path
+
+
+def read(table, columns=None, filters=None, root=dataset_dir):
+    """Load a table of results from every matching partition.
+
+    Parameters
+    ----------
+    table : str
+        Dataset name, the kind of result.
+    columns : list of str, optional
+        Columns to load, including partition columns.  All if None.
+    filters : list of tuple or pyarrow.compute.Expression, optional
+        Row filters like `pd.read_parquet`, e.g. [("detector", "==", "kamland")].
+        Filters on partition columns skip the files of other partitions.
+    root : str, default env.dataset_dir
+        Dataset location.
+
+    Returns
+    -------
+    df : pd.DataFrame
+        Matching rows with the partition columns.
+
+    Notes
+    -----
+    Tables of different detectors can have different channel columns; channels
+    missing from a partition are null.
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+
+    path = f"{root}/{table}"
+    if not isdir(path):
+        raise FileNotFoundError(f"No {table} results in {root}")
+
+    fields = pa.schema(list(partition_types.items()))
+    partitioning = ds.partitioning(fields, flavor="hive")
+    data = ds.dataset(path, format="parquet", partitioning=partitioning)
+    schemas = [fragment.physical_schema for fragment in data.get_fragments()]
+    schema = pa.unify_schemas(schemas + [partitioning.schema])
+    data = ds.dataset(path, schema=schema, format="parquet", partitioning=partitioning)
+
+    if isinstance(filters, list):
+        filters = pq.filters_to_expression(filters)
+
+    return data.to_table(columns=columns, filter=filters).to_pandas()
+
+
+def tables(root=dataset_dir):
+    """Names of the result tables in the dataset."""
+    if not isdir(root):
+        return []
+
+    return sorted(name for name in listdir(root) if isdir(f"{root}/{name}"))
@@ -15,6 +15,10 @@ class Detector:
     ----------
     name: str
         Detector name in SNOwGLoBES (and sspike (copying SNOwGLoBES ( ;) ))).
+    quenching : str, default "kamland"
+        Proton quenching model for pnut.quench(): "kamland" or "birks".
+    kB : float, optional
+        Birks constant [cm / MeV] for the "birks" quenching model.
 
     Attributes
     ----------
@@ -22,6 +26,8 @@ class Detector:
         Number of target protons for 'kamland' or None.
     N_e : float
         Number of target electrons for 'kamland' or None.
+    material : str or None
+        SNOwGLoBES channel material, or None to guess it from `name`.
     low_cut : float
         Low energy threshold [GeV].
     sspike_functions : list of str
@@ -31,13 +37,16 @@ class Detector:
 
     Note
     ----
-    `name` is also an attribute.
+    `name`, `quenching`, and `kB` are also attributes.
     """
 
-    def __init__(self, name):
+    def __init__(self, name, quenching="kamland", kB=None):
         self.name = name
+        self.quenching = quenching
+        self.kB = kB
         self.N_e = None
         self.N_p = None
+        self.material = None
         if name == "kamland":
             # Calculate number of targets in fiducial volume of radius R_f.
             _R_f = 600  # Radial volume cut [cm].
@@ -46,6 +55,7 @@ class Detector:
             self.N_p = 4 * np.pi * _rho_p * _R_f ** 3 / 3
             # Number of electrons in radius R_f.
             self.N_e = self.N_p * 4.047
+            self.material = "scint"
             # Low energy threshold for KamLAND [GeV].
             self.low_cut = 2e-4
             # Name of sspike.pnut functions to use.
@@ -58,6 +68,7 @@ class Detector:
                 "sspike-files/sspike-elastic",
             ]
         else:
+            self.sspike_functions = []
             self.total_files = [
                 "snow-files/snow-unsmeared_weighted",
                 "snow-files/snow-smeared_weighted",
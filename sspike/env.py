@@ -13,4 +13,13 @@ snowglobes_dir="/Users/joe/src/gitjoe/snowglobes"
 # sspike output directory.
 sspike_dir="/Users/joe/src/gitjoe/sspike/out"
 aux_dir="/Users/joe/src/gitjoe/sspike/sspike/aux"
+#
+# Cached intermediate arrays shared between runs.
+cache_dir="/Users/joe/src/gitjoe/sspike/out/cache"
+#
+# Partitioned Parquet dataset of results (see sspike.dataset).
+dataset_dir="/Users/joe/src/gitjoe/sspike/out/dataset"
+#
+# Formats of saved results, space separated: "parquet" and/or "csv".
+output_formats="parquet csv"
 # fmt: on
@@ -2,22 +2,29 @@
 
 Functions to load SN models and process event rates.
 """
-from os.path import isdir, isfile
-from os import makedirs, listdir, rename
+from os.path import isdir, isfile, basename, dirname, getmtime
+from os import getpid, listdir, makedirs, remove, rename, replace, symlink
+from shutil import copyfile, copyfileobj, move, rmtree
+from tempfile import NamedTemporaryFile
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from multiprocessing import util
 import tarfile
+import json
 
 import pandas as pd
 import numpy as np
 import scipy.constants as cns
-from scipy.integrate import quad
 from astropy import units
 
-import snewpy.models.ccsn
-from snewpy.neutrino import Flavor
-from snewpy import snowglobes
+# snewpy (seconds to import) is imported by the functions that use it.
 
-from .env import snowglobes_dir, aux_dir
+from .env import snowglobes_dir, aux_dir, cache_dir, output_formats
+from . import snow, dataset, cube
+from .core.cache import digest, file_digest, save_npy, load_npy
+from .core.cache import save_frames, load_frames
 from .core.logging import getLogger
+from ._version import __version__
 
 log = getLogger(__name__)
 
@@ -29,10 +36,38 @@ hbcu = cns.physical_constants["reduced Planck constant times c in MeV fm"]
 hbarc = hbcu[0] * 1e-13 * 1e-3  # Convert fm to cm and MeV to GeV
 Cv = 0.04  # Vector coupling constant
 Ca = 1.27 / 2  # Axial coupling constant
+E_max = 0.1  # Upper neutrino energy for neutral-current integrals [GeV].
+# Number of snewpy model objects kept in memory by load_model(); change it
+# with set_model_cache_size().
+model_cache_size = 8
+# Distance [kpc] at which rates are computed before 1/d^2 rescaling.
+reference_distance = 10.0
 
-# Path to SNOwGLoBES cross-section files used for cross-checking sspike.
-xs_ibd = "/Users/joe/src/snowglobes/xscns/xs_ibd.dat"
-xs_e = "/Users/joe/src/snowglobes/xscns/xs_nue_e.dat"
+# Time bins over the model window of the cached fine rates that
+# rebinned_time_events() sums into coarser or windowed binnings.
+base_t_bins = 2520
+
+# Bragg-Kleeman range of protons in KamLAND scintillator, R = bk_alpha * T^bk_p
+# with R [cm] and T [MeV] (water values scaled to a density of 0.78 g/cm^3).
+bk_alpha = 0.0022 / 0.78
+bk_p = 1.77
+
+# Gauss-Legendre nodes per fluence interval for fixed-grid NC integration.
+nc_modes = {"fast": 2, "accurate": 6}
+
+# Fluence column used for each neutrino-proton elastic channel.
+nc_flavors = {
+    "nc_nue_p": "NuE",
+    "nc_nuebar_p": "aNuE",
+    "nc_nux_p": "NuMu",
+    "nc_nuxbar_p": "aNuMu",
+}
+
+# Columns of snewpy fluence files: energy [GeV] and fluence by flavor [cm^-2].
+flu_names = ["E", "NuE", "NuMu", "NuTau", "aNuE", "aNuMu", "aNuTau"]
+
+# Row of each flavor in SNOwGLoBES cross-section tables from get_xscn().
+xs_flavors = {"nue": 0, "numu": 1, "nutau": 2, "nuebar": 3, "numubar": 4, "nutaubar": 5}
 
 
 def get_luminosities(sn, save=True):
@@ -48,14 +83,17 @@ def get_luminosities(sn, save=True):
     df : pd.DataFrame
         Simulation times [s] and flavor luminosities [erg / s].
     """
-    if isfile(sn.lum_file):
-        df = pd.read_csv(sn.lum_file, sep=" ")
+    from snewpy.neutrino import Flavor
 
+    path = result_path("luminosity", result_key(sn, scope="progenitor"))
+    if isdir(path):
+        df = load_frames(path)["luminosity"]
+        if save:
+            save_results("luminosity", df, sn.lum_file, sn, missing=True)
         return df
 
     # Initialize model using snewpy.
-    model_type = getattr(snewpy.models.ccsn, sn.model)
-    sn_sim = model_type(sn.sim_file)
+    sn_sim = load_model(sn)
 
     # Luminosity vs. time dataframe.
     df = pd.DataFrame()
@@ -69,8 +107,9 @@ def get_luminosities(sn, save=True):
         log.error(msg)
         return msg
 
+    save_frames(path, {"luminosity": df})
     if save:
-        df.to_csv(sn.lum_file, sep=" ", index=False)
+        save_results("luminosity", df, sn.lum_file, sn)
 
     return df
 
@@ -90,17 +129,361 @@ def get_fluences(sn, index=0):
     df : pd.Dataframe
         Energy [GeV] and fluence by flavor [cm^-2].
     """
-    if not isfile(sn.tar_file):
-        fluence_tarball(sn)
-
-    names = ["E", "NuE", "NuMu", "NuTau", "aNuE", "aNuMu", "aNuTau"]
-    df = pd.read_csv(
-        sn.flu_file[index], sep="   ", skiprows=2, names=names, engine="python"
-    )
+    df = pd.DataFrame(fluence_store(sn)[index], columns=flu_names)
 
     return df
 
 
+def fluence_store(sn):
+    """Fluences of every time bin as one memory-mapped binary array.
+
+    Fluences are saved once at `fluence_path`, keyed by `result_key`; later
+    reads are slices of the memory-mapped file.
+
+    Parameters
+    ----------
+    sn : sspike.Supernova
+        Supernova specifics.
+
+    Return
+    ------
+    store : np.memmap
+        Shape (t_bins, E, 7) with columns ordered as `flu_names`.
+
+    Notes
+    -----
+    Fluences extracted from a current snewpy tarball (see `tarball_current`)
+    are converted.  Otherwise
+    they are scaled from the fluences at `reference_distance` if `sn.rescale`,
+    or computed in memory by `model_fluences` without writing a tarball.
+    """
+    path = fluence_path(sn)
+    if isfile(path):
+        return load_npy(path)
+
+    if tarball_current(sn) and all(isfile(flu) for flu in sn.flu_file):
+        log.debug(f"\nConverting fluences to {path}\n")
+        store = np.array([np.loadtxt(path, comments="#") for path in sn.flu_file])
+    elif rescaled(sn):
+        store = np.array(fluence_store(sn.at_distance(reference_distance)))
+        store[:, :, 1:] *= distance_scale(sn)
+    else:
+        # No SNOwGLoBES tarball needed for sspike-only channels.
+        store = model_fluences(sn)
+    save_npy(path, store)
+
+    return load_npy(path)
+
+
+def fluence_path(sn):
+    """Cached fluence array of `fluence_store` for the inputs of `sn`."""
+    return f"{result_path('fluence', result_key(sn))}/fluence.npy"
+
+
+def tarball_current(sn):
+    """Whether `sn.tar_file` was generated from the current inputs of `sn`.
+
+    `fluence_tarball` stamps the tarball with its `result_key`, so a tarball
+    of an edited model file or an older sspike version is generated again.
+    """
+    stamp = f"{sn.tar_file}.key"
+    if not isfile(sn.tar_file) or not isfile(stamp):
+        return False
+    with open(stamp) as f:
+        return f.read() == result_key(sn)
+
+
+def result_key(sn, detector=None, *parts, scope="supernova"):
+    """Hash of everything a cached pnut result depends on.
+
+    Parameters
+    ----------
+    sn : sspike.Supernova
+        Supernova simulation specifics.
+    detector : sspike.Detector, optional
+        Detector whose configuration the result depends on.
+    *parts
+        Other inputs, e.g. time bin index or engine.
+    scope : str, default "supernova"
+        "progenitor" for results of the model file alone, or "supernova" to
+        include transformation, distance, and time binning.
+
+    Returns
+    -------
+    key : str
+        `digest` of the inputs, the energy grids, and the sspike version.
+    """
+    inputs = [
+        __version__,
+        model_digest(sn.sim_file),
+        sn.model,
+        json.dumps(sn.progenitor, sort_keys=True, default=str),
+        snow_energy(),
+        recoil_energy(),
+    ]
+    if scope == "supernova":
+        inputs += [sn.transform, sn.distance, sn.rescale]
+        inputs += [sn.t_bins, sn.t_start, sn.t_end]
+    if detector is not None:
+        inputs.append(json.dumps(vars(detector), sort_keys=True, default=str))
+
+    return digest(*inputs, *parts)
+
+
+def result_path(stage, key):
+    """Cache directory of a result, e.g. published with `save_frames`."""
+    return f"{cache_dir}/results/{stage}/{key}"
+
+
+def save_results(table, df, csv_file, sn, detector=None, index=None, missing=False):
+    """Save a result table in each format of `env.output_formats`.
+
+    Parameters
+    ----------
+    table : str
+        Name of the table in `sspike.dataset`.
+    df : pd.DataFrame
+        Result table.
+    csv_file : str
+        Path of the CSV export.
+    sn : sspike.Supernova
+        Supernova simulation specifics.
+    detector : sspike.Detector, optional
+        Detector of the result.
+    index : int, optional
+        Time bin of the result.
+    missing : bool, default False
+        Only write the formats without a saved file, e.g. for a cached result.
+    """
+    formats = output_formats.split()
+    if "parquet" in formats:
+        if not (missing and isfile(dataset.file_path(table, sn, detector, index))):
+            dataset.write(table, df, sn, detector, index)
+    if "csv" in formats:
+        if not (missing and isfile(csv_file)):
+            df.to_csv(csv_file, sep=" ", index=False)
+
+
+def model_digest(path):
+    """Content hash of a model file, recomputed only when it is modified."""
+    return _model_digest(path, getmtime(path))
+
+
+@lru_cache(maxsize=None)
+def _model_digest(path, mtime):
+    return file_digest(path)
+
+
+def rescaled(sn):
+    """Whether results for `sn` are scaled from `reference_distance`."""
+    return sn.rescale and sn.distance != reference_distance
+
+
+def distance_scale(sn):
+    """Factor (reference_distance / sn.distance)^2 applied to rescaled rates."""
+    return (reference_distance / sn.distance) ** 2
+
+
+def load_model(sn):
+    """Initialize the snewpy model for a supernova.
+
+    Models are shared within a process: the `model_cache_size` most recently
+    used (model class, file) pairs are kept (see `set_model_cache_size`), so
+    repeated calls for the same simulation file do not parse it again.  Files
+    converted by `convert.convert` are memory-mapped instead of read through
+    snewpy.
+
+    Parameters
+    ----------
+    sn : sspike.Supernova
+        Supernova specifics.
+
+    Return
+    ------
+    snewpy.models.base.SupernovaModel
+        Model loaded from `sn.sim_file`.
+    """
+    return _load_model(sn.model, sn.sim_file, getmtime(sn.sim_file))
+
+
+def set_model_cache_size(n):
+    """Keep the `n` most recently used models in memory.
+
+    Parameters
+    ----------
+    n : int or None
+        Models kept by `load_model`, unbounded if None.  Models already loaded
+        are dropped.
+    """
+    global model_cache_size, _load_model
+    model_cache_size = n
+    _load_model = lru_cache(maxsize=n)(_read_model)
+
+
+def _read_model(model, path, mtime):
+    import snewpy.models.ccsn
+    from .convert import stored_model
+
+    # Files converted with `sspike convert` skip the snewpy readers.
+    stored = stored_model(model, path)
+    if stored is not None:
+        return stored
+
+    log.debug(f"\nLoading {model} model from {path}\n")
+    model_type = getattr(snewpy.models.ccsn, model)
+
+    return model_type(path)
+
+
+_load_model = lru_cache(maxsize=model_cache_size)(_read_model)
+
+
+def flavor_transformation(transform):
+    """snewpy flavor transformation for a transformation name.
+
+    Parameters
+    ----------
+    transform : str
+        "NoTransformation", "AdiabaticMSW_NMO", or "AdiabaticMSW_IMO".
+
+    Return
+    ------
+    snewpy.flavor_transformation.FlavorTransformation
+    """
+    from snewpy.neutrino import MassHierarchy
+    from snewpy.flavor_transformation import NoTransformation, AdiabaticMSW
+
+    if transform == "NoTransformation":
+        return NoTransformation()
+    if transform == "AdiabaticMSW_NMO":
+        return AdiabaticMSW(mh=MassHierarchy.NORMAL)
+    if transform == "AdiabaticMSW_IMO":
+        return AdiabaticMSW(mh=MassHierarchy.INVERTED)
+
+    raise ValueError(f"Unknown transformation: {transform}")
+
+
+def model_fluences(sn):
+    """Evaluate fluences for every time bin in memory.
+
+    Follows `snowglobes.generate_fluence`: spectra at the model times are
+    weighted by their overlap with each bin and scaled to a 0.2 MeV energy
+    bin at the supernova distance, but nothing is written to disk.
+
+    Parameters
+    ----------
+    sn : sspike.Supernova
+        Supernova specifics.
+
+    Return
+    ------
+    store : np.array
+        Shape (t_bins, 501, 7) with columns ordered as `flu_names`.
+    """
+    from snewpy.neutrino import Flavor
+
+    log.info(f"\nEvaluating fluences for {sn.sn_name} in memory.\n")
+    model = load_model(sn)
+    xform = flavor_transformation(sn.transform)
+
+    t = model.get_time().to_value(units.s)
+    ts, _, te = sn.bin_times()
+    W = time_weights(t, ts.to_value(units.s), te.to_value(units.s))
+
+    # Same unit constants as snowglobes.generate_fluence.
+    MeV = 1.60218e-6 * units.erg
+    d = sn.distance * 1000 * 3.086e18  # [cm]
+
+    # Spectra [erg^-1 s^-1] only at the model times that are used.
+    energy = np.linspace(0, 100, 501) * MeV
+    used = np.flatnonzero(np.any(W != 0, axis=0))
+    spectra = np.zeros((len(t), len(Flavor), len(energy)))
+    for j in used:
+        spec = model.get_transformed_spectra(t[j] * units.s, energy, xform)
+        for k, flavor in enumerate(Flavor):
+            spectra[j, k] = spec[flavor].to_value(1 / (units.erg * units.s))
+
+    # Neutrinos per cm^2 in each 0.2 MeV bin.
+    scale = (0.2 * MeV).to_value(units.erg) / (4 * np.pi * d ** 2)
+    fluence = np.einsum("it,tke->ike", W, spectra) * scale
+
+    flavors = list(Flavor)
+    columns = [Flavor.NU_E, Flavor.NU_X, Flavor.NU_X]
+    columns += [Flavor.NU_E_BAR, Flavor.NU_X_BAR, Flavor.NU_X_BAR]
+    store = np.zeros((sn.t_bins, len(energy), len(flu_names)))
+    store[:, :, 0] = (energy / (1e3 * MeV)).to_value()
+    for j, flavor in enumerate(columns, start=1):
+        store[:, :, j] = fluence[:, flavors.index(flavor)]
+
+    return store
+
+
+def time_weights(t, ts, te):
+    """Time [s] each model sample represents in each time bin.
+
+    The spectrum is taken as constant around each sample: a sample stands for
+    the interval from the mid-point with its previous neighbour to the
+    mid-point with its next one (the first and last intervals end at the
+    sample).  A bin gets the length of its overlap with each interval, after
+    the bin is clipped to the model times [t[0], t[-1]].
+
+    Parameters
+    ----------
+    t : np.array
+        Model sample times [s].
+    ts : np.array
+        Bin start times [s].
+    te : np.array
+        Bin end times [s].
+
+    Return
+    ------
+    W : np.array
+        Shape (bins, samples).  Bins are clipped to the model times.
+    """
+    t_lo = np.concatenate([[t[0]], (t[1:] + t[:-1]) / 2])
+    t_hi = np.concatenate([(t[1:] + t[:-1]) / 2, [t[-1]]])
+    ts = np.maximum(ts, t[0])
+    te = np.minimum(te, t[-1])
+
+    first = np.searchsorted(t_hi, ts, side="right")
+    last = np.searchsorted(t_hi, te, side="left")
+    W = np.zeros((len(ts), len(t)))
+    for i in range(len(ts)):
+        s, e = first[i], last[i]
+        # Bin inside one sample interval, including one ending on its edge.
+        if e <= s:
+            W[i, s] = te[i] - ts[i]
+            continue
+        W[i, s] = t_hi[s] - ts[i]
+        W[i, s + 1 : e] = t_hi[s + 1 : e] - t_lo[s + 1 : e]
+        W[i, e] += te[i] - t_lo[e]
+
+    return W
+
+
+def fluence_matrix(sn):
+    """Stack the fluences of every time bin.
+
+    Parameters
+    ----------
+    sn : sspike.Supernova
+        Supernova specifics.
+
+    Return
+    ------
+    E : np.array
+        Energy [GeV].
+    F : dict of np.array
+        Fluence [cm^-2] by flavor, shape (t_bins, E).
+    """
+    store = fluence_store(sn)
+    E = store[0, :, 0]
+    F = {name: store[:, :, j] for j, name in enumerate(flu_names) if j > 0}
+
+    return E, F
+
+
 def fluence_tarball(sn, t_start=None, t_end=None):
     """Generate fluences tarball via snewpy and extract in sn.bin_dir.
 
@@ -117,6 +500,8 @@ def fluence_tarball(sn, t_start=None, t_end=None):
     -----
     Runs snewpy and extracts returned tarball into fluence output directory.
     """
+    from snewpy import snowglobes
+
     log.info(f"\nGenerating fluences for {sn.sn_name} in {sn.sn_dir}.\n")
     log.debug(f"\nt_start: {t_start}\nt_end: {t_end}\n")
 
@@ -191,8 +576,11 @@ def fluence_tarball(sn, t_start=None, t_end=None):
             snewpy_path = new_path[:-6] + new_path[-4:]
             rename(snewpy_path, new_path)
 
+    with open(f"{sn.tar_file}.key", "w") as f:
+        f.write(result_key(sn))
 
-def snowglobes_events(sn, detector, index=0, save=True):
+
+def snowglobes_events(sn, detector, index=0, save=True, engine="snewpy"):
     """Process fluences with SNOwGLoBES via `snewpy`.
 
     Parameters
@@ -201,55 +589,158 @@ def snowglobes_events(sn, detector, index=0, save=True):
         Simulation details.
     detector : sspike.Detector
         Detector for simulations.
+    engine : str, default "snewpy"
+        "snewpy" to run SNOwGLoBES through snewpy, or "native" for the
+        equivalent in-process calculation of `native_tables`.
 
     Returns
     -------
     dfs : dict of pd.Dataframe
-        Events for each type of SNOwGLoBES data.
+        Events for each type of SNOwGLoBES data, keyed f"{type}_{index}".
+
+    Notes
+    -----
+    Results are cached at `result_path` under a `result_key` of all inputs;
+    the tables written by `save_results` are only exports.
     """
-    log.debug("\n- Generating SNOwGLoBES events.")
+    from snewpy import snowglobes
 
-    if not isfile(sn.tar_file):
-        log.debug("\n- Generating tarball.")
-        fluence_tarball(sn, t_start=sn.t_start * units.s, t_end=sn.t_end * units.s)
+    log.debug("\n- Generating SNOwGLoBES events.")
 
-    else:
-        log.debug(f"\n- Skipping tarball generation for:\n {sn.tar_file}\n")
     dfs = {}
     snow_dir = f"{detector.get_save_dir(sn)}/snow-files"
 
     if not isdir(snow_dir):
         makedirs(snow_dir)
 
-    if isfile(f"{snow_dir}/snow-unsmeared_unweighted_0.csv"):
-        for file in listdir(snow_dir):
-            key = file.split("snow-")[1][:-4]
-            dfs[key] = pd.read_csv(f"{snow_dir}/{file}", sep=" ")
-
-        return dfs
+    path = result_path("snowglobes", result_key(sn, detector, index, engine))
+    cached = isdir(path)
+    if cached:
+        dfs = load_frames(path)
 
-    # Simulate via snewpy.
-    snowglobes.simulate(snowglobes_dir, sn.tar_file, detector_input=detector.name)
-    snow_sim = snowglobes.collate(snowglobes_dir, sn.tar_file, skip_plots=True)
+    elif rescaled(sn):
+        # Events are linear in fluence: scale the reference distance tables.
+        ref = sn.at_distance(reference_distance)
+        ref_dfs = snowglobes_events(ref, detector, index, save=False, engine=engine)
+        for key, df in ref_dfs.items():
+            df = df.copy()
+            df[df.columns[1:]] *= distance_scale(sn)
+            dfs[key] = df
 
-    # First key is detector.  The rest indicate smearing and weighting.
-    keys = list(snow_sim.keys())[1:]
-    header = snow_sim[keys[0]]["header"].split(" ")
+    else:
+        if engine == "native":
+            header, tables = native_tables(sn, detector)
+            snow_sim = {
+                f"_events_{key}.dat": {
+                    "header": " ".join(header),
+                    "data": table[index].T,
+                }
+                for key, table in tables.items()
+            }
+            keys = list(snow_sim.keys())
 
-    # Save event dataframes by smearing and weighting.
-    for key in keys:
-        data = snow_sim[key]["data"].T
-        df = pd.DataFrame(data, columns=header)
-        df_key = key.split("_events_")[1][:-4]
-        dfs[df_key] = df
+        else:
+            if not tarball_current(sn):
+                log.debug("\n- Generating tarball.")
+                t_start = sn.t_start * units.s
+                fluence_tarball(sn, t_start=t_start, t_end=sn.t_end * units.s)
 
-        if save:
-            snow_file = f"{snow_dir}/snow-{df_key}_{index}.csv"
-            df.to_csv(snow_file, sep=" ", index=False)
+            else:
+                msg = f"\n- Skipping tarball generation for:\n {sn.tar_file}\n"
+                log.debug(msg)
+
+            # Simulate via snewpy.
+            snowglobes.simulate(
+                snowglobes_tree(), sn.tar_file, detector_input=detector.name
+            )
+            snow_sim = snowglobes.collate(
+                snowglobes_tree(), sn.tar_file, skip_plots=True
+            )
+
+            # First key is detector.  The rest indicate smearing and weighting.
+            keys = list(snow_sim.keys())[1:]
+
+        header = snow_sim[keys[0]]["header"].split(" ")
+
+        # Event dataframes by smearing and weighting.
+        for key in keys:
+            data = snow_sim[key]["data"].T
+            df_key = key.split("_events_")[1][:-4]
+            dfs[f"{df_key}_{index}"] = pd.DataFrame(data, columns=header)
+
+    if not cached:
+        save_frames(path, dfs)
+    if save:
+        for key, df in dfs.items():
+            table = f"snow-{key.rsplit('_', 1)[0]}"
+            csv_file = f"{snow_dir}/snow-{key}.csv"
+            save_results(table, df, csv_file, sn, detector, index, cached)
 
     return dfs
 
 
+def snowglobes_tree():
+    """SNOwGLoBES directory of this process for `snowglobes.simulate`.
+
+    snewpy writes `supernova.glb`, the flux files, and the SNOwGLoBES output
+    into the SNOwGLoBES directory, so processes sharing `env.snowglobes_dir`
+    (sweeps with `--jobs`, `time_events` shards, `batch_totals`) would
+    overwrite each other's files.  Each process uses its own tree in
+    `env.cache_dir` with its own `fluxes` and `out` directories and a copy of
+    `supernova.glb`; everything else links to `env.snowglobes_dir`.  The tree
+    is removed when the process exits.
+
+    Returns
+    -------
+    tree : str
+        SNOwGLoBES directory for this process.
+    """
+    return _snowglobes_tree(getpid())
+
+
+@lru_cache(maxsize=None)
+def _snowglobes_tree(pid):
+    tree = f"{cache_dir}/snowglobes/{pid}"
+    rmtree(tree, ignore_errors=True)
+    makedirs(tree)
+    for name in listdir(snowglobes_dir):
+        if name in ("fluxes", "out"):
+            makedirs(f"{tree}/{name}")
+        elif name == "supernova.glb":
+            copyfile(f"{snowglobes_dir}/{name}", f"{tree}/{name}")
+        else:
+            symlink(f"{snowglobes_dir}/{name}", f"{tree}/{name}")
+    # Also run at the exit of worker processes, unlike `atexit`.
+    util.Finalize(None, rmtree, args=(tree, True), exitpriority=0)
+
+    return tree
+
+
+def native_tables(sn, detector):
+    """SNOwGLoBES-equivalent event tables for all time bins in one call.
+
+    Parameters
+    ----------
+    sn : sspike.Supernova
+        Simulation details.
+    detector : sspike.Detector
+        Detector for simulations.
+
+    Returns
+    -------
+    header : list of str
+        "Energy" followed by the collated channels.
+    tables : dict of np.array
+        Keys "{unsmeared,smeared}_{unweighted,weighted}", each with shape
+        (t_bins, energy, header) like the tables of `snowglobes.collate`.
+    """
+    engine = snow.get_engine(detector.name, detector.material)
+    store = fluence_store(sn)
+    events = engine.rates(store[0, :, 0], store[:, :, 1:])
+
+    return engine.collate(events)
+
+
 def sspike_events(sn, detector, index=0, save=True):
     """Process event rates using sspike functions.
 
@@ -267,33 +758,30 @@ def sspike_events(sn, detector, index=0, save=True):
     """
     log.debug("- Generating sspike events.")
 
-    if not isfile(sn.tar_file):
-        fluence_tarball(sn, t_start=sn.t_start, t_end=sn.t_end)
-
     dfs = {}
 
     sspike_dir = f"{detector.get_save_dir(sn)}/sspike-files"
 
-    if isdir(sspike_dir):
-        for file in listdir(sspike_dir):
-            key = file.split("sspike-")[-1][:-4]
-            dfs[key] = pd.read_csv(f"{sspike_dir}/{file}", sep=" ")
-
-        return dfs
-
-    makedirs(sspike_dir)
-
-    for name in detector.sspike_functions:
-        try:
-            key = name.split("_")[0]
-        except Exception:
-            key = name
-        dfs[key] = eval(name + f"(sn, detector, {index})")
+    path = result_path("sspike", result_key(sn, detector, index))
+    cached = isdir(path)
+    if not isdir(sspike_dir):
+        makedirs(sspike_dir)
 
+    if cached:
+        dfs = load_frames(path)
+    else:
+        for name in detector.sspike_functions:
+            try:
+                key = name.split("_")[0]
+            except Exception:
+                key = name
+            dfs[f"{key}_{index}"] = eval(name + f"(sn, detector, {index})")
+        save_frames(path, dfs)
     if save:
-        for file in dfs:
-            path = f"{sspike_dir}/sspike-{file}_{index}.csv"
-            dfs[file].to_csv(path, sep=" ", index=False)
+        for file, df in dfs.items():
+            table = f"sspike-{file.rsplit('_', 1)[0]}"
+            csv_file = f"{sspike_dir}/sspike-{file}.csv"
+            save_results(table, df, csv_file, sn, detector, index, cached)
 
     return dfs
 
@@ -339,13 +827,8 @@ def ibd_events(sn, detector, index=0):
     # Energy bins 0.2 MeV and fluences cm^-2.
     fluences = get_fluences(sn, index)
 
-    # Load cross-sections in GLoBES format.
-    xscn = np.genfromtxt(xs_ibd, skip_header=3).T
-    # Energies [log(E GeV)] --> [GeV].
-    x_E = 10 ** xscn[0]
-    # Cross-sections [10^-38 cm^-2 GeV^-1] --> [cm^-2 GeV^-1].
-    x_scale = 1e-38
-    x_nueb = xscn[4] * x_scale
+    # Cross-sections [cm^-2 GeV^-1] on the SNOwGLoBES energy grid.
+    xs_nueb = get_xscn("ibd")[xs_flavors["nuebar"]]
 
     # Number of events: fluence * xscn * bin-size * N_electrons.
     # Energy bins of 0.2 MeV in GeV.
@@ -355,7 +838,6 @@ def ibd_events(sn, detector, index=0):
     bin_size = df["E"][1] - df["E"][0]
     bin_scale = bin_size / 0.0002
     f_nueb = np.interp(df["E"], fluences["E"], fluences["aNuE"])
-    xs_nueb = np.interp(df["E"], x_E, x_nueb)
     df["ibd"] = f_nueb * xs_nueb * df["E"] * detector.N_p * bin_scale
 
     return df
@@ -377,36 +859,29 @@ def e_scat(sn, detector, index=0):
         Summed neutrino-electron events for cross-checking with SNOwGLoBES.
     """
     fluences = get_fluences(sn, index)
-    # Load cross-sections.
-    xscn = np.genfromtxt(xs_e, skip_header=3).T
-    # Energies [log(E GeV)] --> [GeV].
-    x_E = 10 ** xscn[0]
-    # Cross-sections [10^-38 cm^-2 GeV^-1] --> [cm^-2 GeV^-1].
-    x_scale = 1e-38
-    x_nue = xscn[1] * x_scale
-    x_nueb = xscn[4] * x_scale
-    x_nux = xscn[2] * x_scale
+    # Cross-sections [cm^-2 GeV^-1] on the SNOwGLoBES energy grid.
+    xscn = get_xscn("nue_e")
 
     # Number of events: fluence * xscn * N_electrons.
     # Multiply cross-sections from file (in GLoBES formatting) by energy.
     df = pd.DataFrame()
     # Use the same energy grid as SNOwGLoBES.
-    df["E"] = np.linspace(7.49e-4, 9.975e-2, 200)
+    df["E"] = snow_energy()
     bin_size = df["E"][1] - df["E"][0]
     bin_scale = bin_size / 0.0002
 
     # Electron flavor neutrinos.
     f_nue = np.interp(df["E"], fluences["E"], fluences["NuE"])
-    xs_nue = np.interp(df["E"], x_E, x_nue)
+    xs_nue = xscn[xs_flavors["nue"]]
     nue_e = f_nue * xs_nue * df["E"] * detector.N_e * bin_scale
 
     # Positron flavor neutrinos.
     f_nueb = np.interp(df["E"], fluences["E"], fluences["aNuE"])
-    xs_nueb = np.interp(df["E"], x_E, x_nueb)
+    xs_nueb = xscn[xs_flavors["nuebar"]]
     nuebar_e = f_nueb * xs_nueb * df["E"] * detector.N_e * bin_scale
     # Extra factor of 4: nux = nu_mu + nu_mubar + nu_tau + nu_taubar.
     f_nux = np.interp(df["E"], fluences["E"], fluences["NuMu"]) * 4
-    xs_nux = np.interp(df["E"], x_E, x_nux)
+    xs_nux = xscn[xs_flavors["numu"]]
     nux_e = f_nux * xs_nux * df["E"] * detector.N_e * bin_scale
 
     df["e"] = nue_e + nuebar_e + nux_e
@@ -414,7 +889,43 @@ def e_scat(sn, detector, index=0):
     return df
 
 
-def elastic_events(sn, detector, index=0):
+@lru_cache(maxsize=None)
+def get_xscn(name):
+    """SNOwGLoBES cross-sections interpolated on the `snow_energy()` grid.
+
+    The text file is parsed once and the interpolated table is saved in
+    `{cache_dir}/xscns` under a key of the file contents, so later calls (and
+    other processes) only memory-map a binary array.
+
+    Parameters
+    ----------
+    name : str
+        Channel of the SNOwGLoBES file `xscns/xs_{name}.dat`, e.g. "ibd".
+
+    Return
+    ------
+    xs : np.memmap
+        Cross-sections [cm^-2 GeV^-1] with rows ordered as in `xs_flavors`,
+        shape (6, len(snow_energy())).
+    """
+    path = f"{snowglobes_dir}/xscns/xs_{name}.dat"
+    energy = snow_energy()
+    key = digest(file_digest(path), energy)
+    npy = f"{cache_dir}/xscns/xs_{name}_{key}.npy"
+
+    if not isfile(npy):
+        log.debug(f"\nParsing cross-sections {path}\n")
+        xscn = np.genfromtxt(path, skip_header=3).T
+        # Energies [log(E GeV)] --> [GeV].
+        x_E = 10 ** xscn[0]
+        # Cross-sections [10^-38 cm^-2 GeV^-1] --> [cm^-2 GeV^-1].
+        xs = np.array([np.interp(energy, x_E, x) for x in xscn[1:]]) * 1e-38
+        save_npy(npy, xs)
+
+    return load_npy(npy)
+
+
+def elastic_events(sn, detector, index=0, method="quad"):
     """Proton-neutrino elastic scattering events.
 
     Parameters
@@ -423,6 +934,11 @@ def elastic_events(sn, detector, index=0):
         Simulation details.
     detector : sspike.Detector
         Name of SNOwGLoBES detector.
+    method : str, default "quad"
+        Integration method: "quad" for adaptive integration of each recoil bin,
+        "analytic" for exact integration of the linear fluence segments,
+        "response" for the cached response matrix of `nc_response_matrix`, or
+        a key of `nc_modes` for the vectorized fixed-grid engine.
 
     Returns
     -------
@@ -434,19 +950,13 @@ def elastic_events(sn, detector, index=0):
 
     # Assign local variables for simplicity and naming conventions.
     E = fluences["E"]
-    f = {
-        "nc_nue_p": fluences["NuE"],
-        "nc_nuebar_p": fluences["aNuE"],
-        "nc_nux_p": fluences["NuMu"],
-        "nc_nuxbar_p": fluences["aNuMu"],
-    }
+    f = {chan: fluences[flavor] for chan, flavor in nc_flavors.items()}
     # Find differential cross-section as function of proton recoil energy.
     df = pd.DataFrame()
-    # Maximum proton recoil energy for 100 MeV neutrino is 17.5 MeV.
-    df["T_p"] = np.arange(1e-4, 0.0176, 1e-4)
-    df["E_vis"] = quench(df["T_p"])
+    df["T_p"] = recoil_energy()
+    df["E_vis"] = quench(df["T_p"], detector.quenching, detector.kB)
     # Kinematic threshold.
-    df["E_min"] = (df["T_p"] + np.sqrt(df["T_p"] * (df["T_p"] + 2 * M_p))) / 2
+    df["E_min"] = nc_threshold(df["T_p"])
 
     N_bins = len(df["T_p"])
     channels = f.keys()
@@ -458,13 +968,26 @@ def elastic_events(sn, detector, index=0):
     bin_scale = (df["T_p"][1] - df["T_p"][0]) / 2e-4
     # Scale including number of targets.
     scale = detector.N_p * bin_scale
-    # Cross-section depends on proton recoil energy.
-    for i in range(N_bins):
-        T_p = df["T_p"][i]
-        E_min = df["E_min"][i]
-        # Intergrate fluences to get event rates for each flavor.
-        for chan in channels:
-            df[chan][i] = nc_events(T_p, E, f[chan], E_min, scale)
+
+    if method != "quad":
+        # All recoil bins and channels in one pass.
+        f_chans = np.array([f[chan] for chan in channels])
+        if method == "analytic":
+            N = nc_analytic_events(df["T_p"], E, f_chans, scale)
+        elif method == "response":
+            N = nc_response_matrix(detector, df["T_p"], E) @ f_chans.T
+        else:
+            N = nc_grid_events(df["T_p"], E, f_chans, scale, method)
+        for j, chan in enumerate(channels):
+            df[chan] = N[:, j]
+    else:
+        # Cross-section depends on proton recoil energy.
+        for i in range(N_bins):
+            T_p = df["T_p"][i]
+            E_min = df["E_min"][i]
+            # Intergrate fluences to get event rates for each flavor.
+            for chan in channels:
+                df.loc[i, chan] = nc_events(T_p, E, f[chan], E_min, scale)
 
     df["nc_p"] = np.zeros(N_bins)
     for chan in channels:
@@ -473,23 +996,62 @@ def elastic_events(sn, detector, index=0):
     return df
 
 
+def elastic_time_events(sn, detector, save=True):
+    """Proton-neutrino elastic scattering events for every time bin.
+
+    All time bins are folded with the cached response matrix in one
+    (t_bins x E) @ (E x T_p) product per channel.
+
+    Parameters
+    ----------
+    sn : sspike.Supernova
+        Simulation details.
+    detector : sspike.Detector
+        Detector information.
+    save : bool, default True
+        Save the counts as the "elastic" group of the detector's
+        `cube.cube_name`.
+
+    Return
+    ------
+    counts : dict of pd.DataFrame
+        Events by channel with bin mid-times as index and T_p as columns.
+    """
+    _, tm, _ = sn.bin_times()
+    T_p = recoil_energy()
+    E, F = fluence_matrix(sn)
+    R = nc_response_matrix(detector, T_p, E)
+
+    counts = {}
+    for chan, flavor in nc_flavors.items():
+        counts[chan] = pd.DataFrame(F[flavor] @ R.T, index=tm.value, columns=T_p)
+    counts["nc_p"] = sum(counts[chan] for chan in nc_flavors)
+
+    if save:
+        cube_file = f"{detector.get_save_dir(sn)}/{cube.cube_name}"
+        N = np.stack([counts[chan].to_numpy() for chan in counts], axis=2)
+        cube.write(cube_file, "elastic", tm.value, T_p, list(counts), N)
+
+    return counts
+
+
 def dxs_nc(E, T_p, a=1):
     """Neutral-current double differential cross-section.
 
     Parameters
     ----------
-    E : float
+    E : float or np.array
         Neutrino energy in GeV.
-    T_p : float
-        Proton recoil energy in GeV.
+    T_p : float or np.array
+        Proton recoil energy in GeV.  Arrays must broadcast with `E`.
 
     Returns
     -------
-    dsig : float
+    dsig : float or np.array
         Differential cross-section in with respect to proton recoil energy
         with units of cm^2 / GeV.
     """
-    if E == 0 or T_p == 0:
+    if np.ndim(E) == 0 and np.ndim(T_p) == 0 and (E == 0 or T_p == 0):
         return 0
 
     # Cross-section has three terms with a shared coefficient.
@@ -503,7 +1065,7 @@ def dxs_nc(E, T_p, a=1):
     return dsig
 
 
-def quench(T_p):
+def quench(T_p, model="kamland", kB=None):
     """
     Convert proton recoil energy to electron equivalent energy.
 
@@ -511,6 +1073,10 @@ def quench(T_p):
     ----------
     T_p : np.array
         Proton recoil energies of interest $[MeV]$.
+    model : str, default "kamland"
+        "kamland" for the digitized KamLAND curve or "birks" for `birks_quench`.
+    kB : float or np.array, optional
+        Birks constant [cm / MeV], required for the "birks" model.
 
     Return
     ------
@@ -521,72 +1087,440 @@ def quench(T_p):
         Quenching factors using WebPlotDigitizer on Fig. 6 in:
         https://www.sciencedirect.com/science/article/pii/S0168900210017018
     """
-    quenching = f"{aux_dir}/proton_quenching.csv"
-    qE, qX = np.genfromtxt(quenching, delimiter=",").T
+    if model == "birks":
+        return birks_quench(T_p, kB)
+    if model != "kamland":
+        raise ValueError(f"Unknown quenching model: {model}")
+
+    qE, qX = quench_table()
     E = T_p * np.interp(T_p, qE, qX)
 
     return E
 
 
-def nc_events(T_p, E, f, E_min, scale=1):
+@lru_cache(maxsize=None)
+def quench_table(path=f"{aux_dir}/proton_quenching.csv"):
+    """Quenching factors loaded once per process.
+
+    Parameters
+    ----------
+    path : str
+        CSV file of (energy, quenching factor) pairs.
+
+    Return
+    ------
+    qE, qX : np.array
+        Read-only energies and quenching factors.
     """
-    Integrate neutrino differential cross-section and fluence w.r.t. energy.
+    qE, qX = np.genfromtxt(path, delimiter=",").T
+    for q in (qE, qX):
+        q.setflags(write=False)
+
+    return qE, qX
+
+
+def birks_quench(T_p, kB, n_grid=4001):
+    """Electron equivalent energy from Birks' law.
+
+    E_vis(T) = integral from 0 to T of dE / (1 + kB dE/dx), with the proton
+    stopping power dE/dx from the Bragg-Kleeman rule (`bk_alpha`, `bk_p`).
 
     Parameters
     ----------
-    T_p : float
-        Proton recoil energy $[MeV]$.
-    E : np.array
-        Neutrino energies $[MeV]$.
-    f : np.array
-        Neutrino fluence $$
+    T_p : np.array
+        Proton recoil energies [GeV].
+    kB : float or np.array
+        Birks constant(s) [cm / MeV].
+    n_grid : int, default 4001
+        Integration points between 0 and max(T_p).
 
     Return
     ------
     E : np.array
-        Electron equivalent energy in KamLAND.
+        Electron equivalent energy [GeV].  Shape of `T_p` for scalar `kB`,
+        otherwise (len(kB), len(T_p)) with one row per Birks constant.
     """
-    N = quad(lambda x: dxs_nc(x, T_p) * np.interp(x, E, f), E_min, 0.1)[0]
-    return N * scale
+    if kB is None:
+        raise ValueError("Birks quenching requires kB.")
+    T = np.asarray(T_p, dtype=float) * 1e3  # [MeV]
+    kBs = np.atleast_1d(np.asarray(kB, dtype=float))[:, None]
+
+    grid = np.linspace(0, np.max(T), n_grid)
+    # Stopping power [MeV / cm], infinite (no light unless kB = 0) at T = 0.
+    dEdx = grid[1:] ** (1 - bk_p) / (bk_alpha * bk_p)
+    light = np.empty((len(kBs), n_grid))
+    light[:, 0] = kBs[:, 0] == 0
+    light[:, 1:] = 1 / (1 + kBs * dEdx)
+    cumulative = np.zeros_like(light)
+    cumulative[:, 1:] = np.cumsum((light[:, 1:] + light[:, :-1]) / 2, axis=1)
+    cumulative *= grid[1] - grid[0]
+    E = np.array([np.interp(T, grid, c) for c in cumulative]) * 1e-3
+
+    if np.ndim(kB) == 0:
+        return E[0]
 
+    return E
 
-def event_totals(sn, detector, index=0, save=True):
-    """Sum event totals from snowglobes_events() and sspike_events().
+
+def quench_scan(elastic, detector, kB):
+    """Visible elastic events above threshold for many Birks constants.
 
     Parameters
     ----------
-    sn : sspike.Supernova
-        Simulation specifics.
+    elastic : pd.DataFrame
+        Output of `elastic_events`.
     detector : sspike.Detector
-        Detector specifics.
+        Detector providing `low_cut`.
+    kB : np.array
+        Birks constants [cm / MeV].
 
     Return
     ------
     df : pd.DataFrame
-        3 column dataframe: file_type, channel, events.
+        Columns: kB, nc_p_cut.
     """
-    bin_dir = detector.get_save_dir(sn)
-    tot_file = f"{bin_dir}/totals_all_{index}.csv"
+    kB = np.atleast_1d(kB)
+    E_vis = birks_quench(elastic["T_p"], kB)
+    keep = E_vis >= detector.low_cut
+    N_cut = keep @ elastic["nc_p"].to_numpy()
 
-    if isfile(tot_file):
-        df = pd.read_csv(tot_file, sep=" ")
+    return pd.DataFrame({"kB": kB, "nc_p_cut": N_cut})
 
-        return df
+
+def nc_events(T_p, E, f, E_min, scale=1):
+    """
+    Integrate neutrino differential cross-section and fluence w.r.t. energy.
+
+    Parameters
+    ----------
+    T_p : float
+        Proton recoil energy $[MeV]$.
+    E : np.array
+        Neutrino energies $[MeV]$.
+    f : np.array
+        Neutrino fluence $$
+
+    Return
+    ------
+    E : np.array
+        Electron equivalent energy in KamLAND.
+    """
+    from scipy.integrate import quad
+
+    N = quad(lambda x: dxs_nc(x, T_p) * np.interp(x, E, f), E_min, E_max)[0]
+    return N * scale
+
+
+def nc_threshold(T_p):
+    """Minimum neutrino energy able to produce a proton recoil.
+
+    Parameters
+    ----------
+    T_p : float or np.array
+        Proton recoil energy [GeV].
+
+    Return
+    ------
+    E_min : float or np.array
+        Kinematic threshold neutrino energy [GeV].
+    """
+    return (T_p + np.sqrt(T_p * (T_p + 2 * M_p))) / 2
+
+
+def nc_grid_events(T_p, E, f, scale=1, mode="fast"):
+    """Integrate fluences for every recoil energy and channel at once.
+
+    Each linear fluence interval above threshold is integrated with a fixed
+    Gauss-Legendre rule, so the whole (T_p x E x channel) integrand is
+    evaluated in a single NumPy pass instead of one `quad` call per bin.
+
+    Parameters
+    ----------
+    T_p : np.array
+        Proton recoil energies [GeV].
+    E : np.array
+        Neutrino energies of the tabulated fluences [GeV].
+    f : np.array
+        Fluences on `E`, one row per channel [cm^-2].
+    scale : float, default 1
+        Number of targets times bin size scaling.
+    mode : str, default "fast"
+        Key of `nc_modes` setting the number of nodes per fluence interval.
+
+    Return
+    ------
+    N : np.array
+        Events with shape (len(T_p), channels).
+    """
+    T_p = np.asarray(T_p, dtype=float)
+    E, f = _nc_pad(E, f)
+    lo, hi = _nc_limits(T_p, E)
+    m0, m1 = _nc_moments_grid(T_p, lo, hi, nc_modes[mode])
+
+    return _nc_fold(m0, m1, E, f) * scale
+
+
+def nc_analytic_events(T_p, E, f, scale=1, a=1):
+    """Exact events for fluences that are linear between tabulated energies.
+
+    On each fluence segment the integrand is a linear function times
+    `dxs_nc`, a sum of powers E^0, E^-1 and E^-2, so every segment above
+    threshold has a closed form and no quadrature is needed.
+
+    Parameters
+    ----------
+    T_p : np.array
+        Proton recoil energies [GeV].
+    E : np.array
+        Neutrino energies of the tabulated fluences [GeV].
+    f : np.array
+        Fluences on `E`, one row per channel [cm^-2].
+    scale : float, default 1
+        Number of targets times bin size scaling.
+    a : int, default 1
+        Sign of the axial term, as in `dxs_nc`.
+
+    Return
+    ------
+    N : np.array
+        Events with shape (len(T_p), channels).
+    """
+    T_p = np.asarray(T_p, dtype=float)
+    E, f = _nc_pad(E, f)
+    lo, hi = _nc_limits(T_p, E)
+    m0, m1 = _nc_moments_exact(T_p, lo, hi, a)
+
+    return _nc_fold(m0, m1, E, f) * scale
+
+
+def nc_response(T_p, E, a=1):
+    """Matrix mapping tabulated fluences to unscaled NC events.
+
+    Parameters
+    ----------
+    T_p : np.array
+        Proton recoil energies [GeV].
+    E : np.array
+        Neutrino energies of the tabulated fluences [GeV].
+    a : int, default 1
+        Sign of the axial term, as in `dxs_nc`.
+
+    Return
+    ------
+    R : np.array
+        Shape (len(T_p), len(E)) so that `R @ f` equals
+        `nc_analytic_events(T_p, E, f, a=a)` for any fluence `f` on `E`.
+    """
+    T_p = np.asarray(T_p, dtype=float)
+    # Folding the identity gives the weight of each fluence node.
+    E, unit = _nc_pad(E, np.eye(len(E)))
+    lo, hi = _nc_limits(T_p, E)
+    m0, m1 = _nc_moments_exact(T_p, lo, hi, a)
+
+    return _nc_fold(m0, m1, E, unit)
+
+
+def nc_response_matrix(detector, T_p, E, a=1):
+    """Detector NC response matrix, cached on disk and memory-mapped.
+
+    Parameters
+    ----------
+    detector : sspike.Detector
+        Detector providing target number and quenching.
+    T_p : np.array
+        Proton recoil energies [GeV], evenly spaced.
+    E : np.array
+        Neutrino energies of the tabulated fluences [GeV].
+    a : int, default 1
+        Sign of the axial term, as in `dxs_nc`.
+
+    Return
+    ------
+    R : np.memmap
+        Events per unit fluence including targets and recoil bin scaling,
+        shape (len(T_p), len(E)).
+
+    Notes
+    -----
+    The cache key hashes every input of the matrix (recoil grid, fluence
+    energy grid, `N_p`, quenched energies, `Cv`, `Ca`, and `a`), so a change in
+    any of them writes a new file under `{cache_dir}/response`.
+    """
+    T_p = np.asarray(T_p, dtype=float)
+    E = np.asarray(E, dtype=float)
+    E_vis = quench(T_p, detector.quenching, detector.kB)
+    key = digest(T_p, E, detector.N_p, E_vis, Cv, Ca, a)
+    path = f"{cache_dir}/response/nc_{key}.npy"
+
+    if not isfile(path):
+        log.debug(f"\nComputing NC response matrix {path}\n")
+        # Change from fluence bin width of 0.2 MeV.
+        bin_scale = (T_p[1] - T_p[0]) / 2e-4
+        R = nc_response(T_p, E, a) * detector.N_p * bin_scale
+        save_npy(path, R)
+
+    return load_npy(path)
+
+
+def _nc_pad(E, f):
+    """Extend tabulated fluences to cover [0, E_max] like `np.interp` does.
+
+    Parameters
+    ----------
+    E : np.array
+        Neutrino energies [GeV].
+    f : np.array
+        Fluences on `E`, 1 or 2 dimensional.
+
+    Return
+    ------
+    E, f : np.array
+        Energies and 2D fluences with constant end segments added if needed.
+    """
+    E = np.asarray(E, dtype=float)
+    f = np.atleast_2d(np.asarray(f, dtype=float))
+    if E[0] > 0:
+        E = np.concatenate([[0.0], E])
+        f = np.concatenate([f[:, :1], f], axis=1)
+    if E[-1] < E_max:
+        E = np.concatenate([E, [E_max]])
+        f = np.concatenate([f, f[:, -1:]], axis=1)
+
+    return E, f
+
+
+def _nc_limits(T_p, E):
+    """Integration limits of each fluence interval for each recoil energy.
+
+    Return
+    ------
+    lo, hi : np.array
+        Interval limits clipped to [E_min(T_p), E_max], shape (T_p, intervals).
+    """
+    E_min = nc_threshold(T_p)[:, None]
+    lo = np.clip(E[:-1], E_min, E_max)
+    hi = np.clip(E[1:], E_min, E_max)
+
+    return lo, hi
+
+
+def _nc_moments_grid(T_p, lo, hi, nodes):
+    """Zeroth and first moments of dxs_nc on each interval by Gauss-Legendre.
+
+    Return
+    ------
+    m0, m1 : np.array
+        Integrals of dxs_nc and E * dxs_nc over [lo, hi] [cm^2].
+    """
+    t, w = np.polynomial.legendre.leggauss(nodes)
+    half = (hi - lo)[..., None] / 2
+    x = lo[..., None] + half * (t + 1)
+    # Empty intervals have x == lo > 0, so the cross-section is finite there.
+    g = dxs_nc(x, T_p[:, None, None]) * half * w
+    m0 = np.sum(g, axis=-1)
+    m1 = np.sum(g * x, axis=-1)
+
+    return m0, m1
+
+
+def _nc_moments_exact(T_p, lo, hi, a=1):
+    """Zeroth and first moments of dxs_nc on each interval in closed form.
+
+    Writing dxs_nc = P + Q / E + R / E^2 for fixed T_p gives
+    m0 = P (hi - lo) + Q ln(hi / lo) + R (hi - lo) / (hi lo) and
+    m1 = P (hi^2 - lo^2) / 2 + Q (hi - lo) + R ln(hi / lo).
+
+    Return
+    ------
+    m0, m1 : np.array
+        Integrals of dxs_nc and E * dxs_nc over [lo, hi] [cm^2].
+    """
+    T_p = T_p[:, None]
+    K = (Gf * hbarc) ** 2 * M_p / 2 / np.pi  # [GeV^-1 cm^2]
+    c_nu = (Cv + a * Ca) ** 2
+    c_pnu = (Cv - a * Ca) ** 2
+    c_p = (Cv ** 2 - Ca ** 2) * M_p
+    P = K * (c_nu + c_pnu)
+    Q = -2 * K * c_pnu * T_p
+    R = K * (c_pnu * T_p ** 2 - c_p * T_p)
+
+    width = hi - lo
+    log = np.log(hi / lo)
+    m0 = P * width + Q * log + R * width / (hi * lo)
+    m1 = P * width * (hi + lo) / 2 + Q * width + R * log
+
+    return m0, m1
+
+
+def _nc_fold(m0, m1, E, f):
+    """Combine interval moments with linear fluence segments.
+
+    Parameters
+    ----------
+    m0, m1 : np.array
+        Interval moments of dxs_nc, shape (T_p, intervals).
+    E : np.array
+        Padded neutrino energies [GeV].
+    f : np.array
+        Padded fluences, shape (channels, E).
+
+    Return
+    ------
+    N : np.array
+        Unscaled events, shape (T_p, channels).
+    """
+    slope = np.diff(f, axis=1) / np.diff(E)
+    intercept = f[:, :-1] - slope * E[:-1]
+
+    return m0 @ intercept.T + m1 @ slope.T
+
+
+def event_totals(sn, detector, index=0, save=True, engine="snewpy"):
+    """Sum event totals from snowglobes_events() and sspike_events().
+
+    Parameters
+    ----------
+    sn : sspike.Supernova
+        Simulation specifics.
+    detector : sspike.Detector
+        Detector specifics.
+    engine : str, default "snewpy"
+        SNOwGLoBES engine for `snowglobes_events`.
+
+    Return
+    ------
+    df : pd.DataFrame
+        3 column dataframe: file_type, channel, events.
+    """
+    bin_dir = detector.get_save_dir(sn)
+    tot_file = f"{bin_dir}/totals_all_{index}.csv"
+
+    path = result_path("totals", result_key(sn, detector, index, engine))
+    if isdir(path):
+        df = load_frames(path)["totals_all"]
+        if save:
+            # Export the cached event tables too.
+            snowglobes_events(sn, detector, index, save, engine)
+            sspike_events(sn, detector, index, save)
+            save_results("totals_all", df, tot_file, sn, detector, index, True)
+        return df
 
     row_list = []
     total_files = detector.total_files
-    detector_dir = detector.get_save_dir(sn)
+    events = {
+        "snow": snowglobes_events(sn, detector, index, save, engine),
+        "sspike": sspike_events(sn, detector, index, save),
+    }
 
     for file in total_files:
-        # Path to processed data files.
-        path = f"{detector_dir}/{file}_{index}.csv"
-        if not isfile(path):
-            msg = f"\nWarning!\nFile not found. Skipping:\n{path}"
+        # Processed data, e.g. "snow-files/snow-smeared_weighted".
+        kind, name = file.split("/")[-1].split("-", 1)
+        data = events[kind].get(f"{name}_{index}")
+        if data is None:
+            msg = f"\nWarning!\nEvents not found. Skipping:\n{file}"
             log.warning(msg)
             continue
 
-        # Load data.
-        data = pd.read_csv(path, sep=" ")
         file_type = f"{file.split('-')[-1]}"
 
         # sspike-elastic data have different format than other data.
@@ -611,13 +1545,14 @@ def event_totals(sn, detector, index=0, save=True):
 
     df = pd.DataFrame(row_list)
 
+    save_frames(path, {"totals_all": df})
     if save:
-        df.to_csv(tot_file, sep=" ", index=False)
+        save_results("totals_all", df, tot_file, sn, detector, index)
 
     return df
 
 
-def vis_totals(sn, detector, index=0, save=True):
+def vis_totals(sn, detector, index=0, save=True, engine="snewpy"):
     """Select visible events from all totals.
 
     Parameters
@@ -626,48 +1561,132 @@ def vis_totals(sn, detector, index=0, save=True):
         Supernova simulation specifics.
     detector: sspike.Detector
         Detector information.
+    engine : str, default "snewpy"
+        SNOwGLoBES engine for `snowglobes_events`.
     
     Return
     ------
     df : pd.DataFrame
         DataFrame of event totals and progenitor properties.
     """
-    bin_dir = detector.get_save_dir(sn)
-    vis_file = f"{bin_dir}/totals_vis_{index}.csv"
-
-    if isfile(vis_file):
-        df = pd.read_csv(vis_file, sep=" ")
-
+    path = result_path("vis", result_key(sn, detector, index, engine))
+    detector_dir = detector.get_save_dir(sn)
+    vis_file = f"{detector_dir}/totals_vis_{index}.csv"
+    if isdir(path):
+        df = load_frames(path)["totals_vis"]
+        if save:
+            # Export the cached totals and event tables too.
+            event_totals(sn, detector, index, save, engine)
+            save_results("totals_vis", df, vis_file, sn, detector, index, True)
         return df
 
-    totals = event_totals(sn, detector)
+    totals = event_totals(sn, detector, index, save, engine)
     vis = detector.keep_vis(totals)
 
-    if sn.progenitor:
-        prog_columns = list(sn.progenitor.keys())
-        prog_list = list(sn.progenitor.values())
+    columns = {"model": sn.model, **(sn.progenitor or {})}
+    df = vis[["channel", "events"]].reset_index(drop=True)
+    for i, (column, value) in enumerate(columns.items()):
+        df.insert(i, column, value)
+
+    save_frames(path, {"totals_vis": df})
+    if save:
+        save_results("totals_vis", df, vis_file, sn, detector, index)
+
+    return df
+
+
+def batch_totals(specs, jobs=1, engine="snewpy"):
+    """Visible event totals for many supernova and detector specifications.
+
+    Parameters
+    ----------
+    specs : iterable of dict or pd.DataFrame
+        Rows with "model", "progenitor" (dict), "distance", and optionally
+        "transform" (default "NoTransformation") and "detector" (default
+        "kamland").  Repeated specifications are computed once.
+    jobs : int, default 1
+        Worker processes.  Specifications sharing a model and progenitor
+        run in the same worker.
+    engine : str, default "snewpy"
+        SNOwGLoBES engine for `snowglobes_events`.
+
+    Return
+    ------
+    df : pd.DataFrame
+        Long format totals with columns model, progenitor properties,
+        distance, transform, detector, channel, and events, in spec order.
+    """
+    if isinstance(specs, pd.DataFrame):
+        specs = specs.to_dict(orient="records")
+    defaults = {"transform": "NoTransformation", "detector": "kamland"}
+    specs = [{**defaults, **spec} for spec in specs]
+
+    # Unique specifications, grouped by supernova model file.
+    unique = {}
+    for spec in specs:
+        unique.setdefault(_spec_key(spec), spec)
+    groups = {}
+    for key, spec in unique.items():
+        group = (spec["model"], json.dumps(spec["progenitor"], sort_keys=True))
+        groups.setdefault(group, []).append(spec)
+
+    results = {}
+    if jobs > 1 and len(groups) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = [
+                pool.submit(_batch_group, group, engine) for group in groups.values()
+            ]
+            for future in futures:
+                results.update(future.result())
     else:
-        prog_columns = []
-        prog_list = []
+        for group in groups.values():
+            results.update(_batch_group(group, engine))
 
-    row_list = []
-    for row in vis.to_numpy():
-        new_row = [sn.model] + prog_list + row.tolist()
-        row_list.append(new_row)
+    frames = []
+    for spec in specs:
+        df = results[_spec_key(spec)]
+        frames.append(
+            df.assign(
+                distance=float(spec["distance"]),
+                transform=spec["transform"],
+                detector=spec["detector"],
+            )
+        )
+    df = pd.concat(frames, ignore_index=True)
 
-    column_names = ["model"] + prog_columns + ["channel", "events"]
+    columns = [col for col in df.columns if col not in ["channel", "events"]]
 
-    df = pd.DataFrame(row_list, columns=column_names)
+    return df[columns + ["channel", "events"]]
 
-    if save:
-        detector_dir = detector.get_save_dir(sn)
-        vis_file = f"{detector_dir}/totals_vis_{index}.csv"
-        df.to_csv(vis_file, sep=" ", index=False)
 
-    return df
+def _spec_key(spec):
+    """Identifier of a `batch_totals` specification."""
+    values = [spec[name] for name in ["model", "progenitor", "transform"]]
+    values += [float(spec["distance"]), spec["detector"]]
+
+    return json.dumps(values, sort_keys=True)
+
+
+def _batch_group(specs, engine):
+    """Visible totals of specifications in series, keyed by `_spec_key`."""
+    # Supernova imports pnut.
+    from .supernova import Supernova
+    from .detectors import Detector
+
+    results = {}
+    for spec in specs:
+        sn = Supernova(
+            spec["model"], spec["progenitor"], spec["transform"], spec["distance"]
+        )
+        detector = Detector(spec["detector"])
+        results[_spec_key(spec)] = vis_totals(
+            sn, detector, save=False, engine=engine
+        )
 
+    return results
 
-def time_events(sn, detector):
+
+def time_events(sn, detector, engine="snewpy", jobs=1, save=True):
     """Process time series with snowglobes.
 
     Parameters
@@ -676,75 +1695,471 @@ def time_events(sn, detector):
         Supernova simulation specifics.
     detector: sspike.Detector
         Detector information.
+    engine : str, default "snewpy"
+        "snewpy" to run SNOwGLoBES through snewpy, or "native" for the
+        equivalent in-process calculation of `native_tables`.
+    jobs : int, default 1
+        Worker processes for the "snewpy" engine.  With more than one, time
+        bins are split into shards that are run through SNOwGLoBES in
+        separate scratch directories and merged afterwards.
+    save : bool, default True
+        Save the counts and channel totals in the detector directory.
+    
+    Notes
+    -----
+    With `sn.rescale`, the "snewpy" engine runs at `reference_distance` and
+    the counts are scaled by 1/d^2.
+
+    Counts are saved in the detector directory as a `cube.cube_name` file
+    (read slices with `cube.read`) and channel totals as `chan_time.csv`.
     
     Return
     ------
     df : pd.DataFrame
         DataFrame of event totals and progenitor properties.
     """
+    from snewpy import snowglobes
+
     ts, tm, te = sn.bin_times()
 
-    save_dir = detector.get_save_dir(sn)
-    # data_dir = f"{save_dir}/snow-files"
+    if engine == "snewpy" and rescaled(sn):
+        # Run SNOwGLoBES once at the reference distance and scale the counts.
+        ref = sn.at_distance(reference_distance)
+        counts = time_events(ref, detector, engine, jobs, save=False)
+        counts = {chan: df * distance_scale(sn) for chan, df in counts.items()}
+        if save:
+            _save_time_events(sn, detector, counts)
+
+        return counts
+
+    if engine == "native":
+        # All time bins at once, without SNOwGLoBES output files.
+        header, tables = native_tables(sn, detector)
+        N = tables["smeared_weighted"][:, :, 1:]
+        energy = tables["smeared_weighted"][0, :, 0]
+
+    else:
+        if jobs > 1 and sn.t_bins > 1:
+            header, energy, bins = _sharded_bins(sn, detector, jobs)
+        else:
+            if not tarball_current(sn):
+                fluence_tarball(sn, t_start=ts, t_end=te)
+                snowglobes.simulate(
+                    snowglobes_tree(), sn.tar_file, detector_input=detector.name
+                )
+
+            tables = snowglobes.collate(snowglobes_tree(), sn.tar_file, skip_plots=True)
+
+            # Check if this tar_file has been run for this detector.
+            if not any(detector.name in file for file in list(tables.keys())[1:]):
+                snowglobes.simulate(
+                    snowglobes_tree(), sn.tar_file, detector_input=detector.name
+                )
+                tables = snowglobes.collate(
+                    snowglobes_tree(), sn.tar_file, skip_plots=True
+                )
+
+            header, energy, bins = _smeared_bins(tables, detector)
+
+        # Tables are (header, energy); missing bins have no events.
+        N = np.zeros((sn.t_bins, len(energy), len(header) - 1))
+        for index, data in bins.items():
+            N[index] = data[1:].T
+
+    chans = header[1:]
+    counts = {}
+    for j, chan in enumerate(chans):
+        counts[chan] = pd.DataFrame(N[:, :, j], index=tm.value, columns=energy)
+
+    # Proton elastic scattering for all bins at once.
+    if "elastic_events" in detector.sspike_functions:
+        counts.update(elastic_time_events(sn, detector, save=False))
+
+    if save:
+        _save_time_events(sn, detector, counts)
+
+    return counts
+
 
+def _save_time_events(sn, detector, counts):
+    """Save time series counts as a cube and channel totals as chan_time.csv.
+
+    Parameters
+    ----------
+    sn : sspike.Supernova
+        Supernova simulation specifics.
+    detector: sspike.Detector
+        Detector information.
+    counts : dict of pd.DataFrame
+        Output of `time_events`.
+    """
+    save_dir = detector.get_save_dir(sn)
     if not isdir(save_dir):
         makedirs(save_dir)
 
-    if not isfile(sn.tar_file):
-        fluence_tarball(sn, t_start=ts, t_end=te)
-        snowglobes.simulate(snowglobes_dir, sn.tar_file, detector_input=detector.name)
+    # Proton elastic channels have their own (recoil) energy bins.
+    elastic = [chan for chan in counts if chan in nc_flavors or chan == "nc_p"]
+    groups = {
+        "snowglobes": [chan for chan in counts if chan not in elastic],
+        "elastic": elastic,
+    }
+    cube_file = f"{save_dir}/{cube.cube_name}"
+    for group, chans in groups.items():
+        if not chans:
+            continue
+        df = counts[chans[0]]
+        N = np.stack([counts[chan].to_numpy() for chan in chans], axis=2)
+        time, energy = df.index.to_numpy(), df.columns.to_numpy(dtype=float)
+        cube.write(cube_file, group, time, energy, chans, N)
+
+    totals = pd.DataFrame({chan: df.sum(axis=1) for chan, df in counts.items()})
+    totals.insert(0, "time", totals.index)
+    totals.to_csv(f"{save_dir}/chan_time.csv", sep=" ", index=False)
+
+
+def stream_time_events(sn, detector, engine="native", block=64, save=True):
+    """Time series events computed and saved a block of time bins at a time.
+
+    Streaming variant of `time_events`: memory use depends on `block`, not on
+    `sn.t_bins`, so consumers can process long, finely binned runs.
+
+    Parameters
+    ----------
+    sn : sspike.Supernova
+        Supernova simulation specifics.
+    detector: sspike.Detector
+        Detector information.
+    engine : str, default "native"
+        "native" for `snow.SnowEngine`, or "snewpy" to run each block of time
+        bins through SNOwGLoBES like a shard of `time_events`.
+    block : int, default 64
+        Time bins computed together.
+    save : bool, default True
+        Append each block to the detector's `cube.cube_name` and channel
+        totals to `chan_time.csv`, replacing earlier results.
+
+    Yields
+    ------
+    index : int
+        Time bin.
+    time : float
+        Bin mid-time [s].
+    events : dict of np.array
+        Smeared, weighted events of each channel by energy, or by proton
+        recoil energy for the proton elastic channels.
 
-    tables = snowglobes.collate(snowglobes_dir, sn.tar_file, skip_plots=True)
+    Notes
+    -----
+    The saved files only hold the bins yielded so far if the consumer stops
+    early.
+    """
+    _, tm, _ = sn.bin_times()
+    tm = tm.to_value(units.s)
+    save_dir = detector.get_save_dir(sn)
+    cube_file = f"{save_dir}/{cube.cube_name}"
+    tot_file = f"{save_dir}/chan_time.csv"
+    if save and not isdir(save_dir):
+        makedirs(save_dir)
 
-    files = list(tables.keys())[1:]
+    store = fluence_store(sn)
+    elastic = "elastic_events" in detector.sspike_functions
+    if elastic:
+        T_p = recoil_energy()
+        R = nc_response_matrix(detector, T_p, store[0, :, 0])
+        nc_columns = [flu_names.index(flavor) for flavor in nc_flavors.values()]
+
+    # SNOwGLoBES runs at the reference distance when rescaling.
+    ref, scale = sn, 1.0
+    if engine == "snewpy" and rescaled(sn):
+        ref, scale = sn.at_distance(reference_distance), distance_scale(sn)
+
+    if engine == "native":
+        snow_engine = snow.get_engine(detector.name, detector.material)
+
+    started = False
+    for start in range(0, sn.t_bins, block):
+        indices = np.arange(start, min(start + block, sn.t_bins))
+
+        if engine == "native":
+            F = store[indices]
+            events = snow_engine.rates(F[0, :, 0], F[:, :, 1:])
+            header, tables = snow_engine.collate(events)
+            N = tables["smeared_weighted"][:, :, 1:]
+            energy = snow_engine.energy
+        else:
+            scratch = f"{save_dir}/shards/{start}"
+            header, energy, bins = _snow_shard(ref, detector, indices, scratch)
+            rmtree(scratch, ignore_errors=True)
+            N = np.zeros((len(indices), len(energy), len(header) - 1))
+            for index, data in bins.items():
+                N[index - start] = data[1:].T * scale
+        chans = header[1:]
+
+        if elastic:
+            nc = store[indices][:, :, nc_columns].transpose(0, 2, 1) @ R.T
+            nc = np.concatenate([nc, nc.sum(axis=1, keepdims=True)], axis=1)
+            nc_chans = list(nc_flavors) + ["nc_p"]
 
-    # Check if this tar_file has been run for this detector.
-    detector_simulated = False
-    for i, file in enumerate(files):
-        if detector.name in file:
-            detector_simulated = True
-            j = i
-            break
+        if save:
+            if not started:
+                cube.create(cube_file, "snowglobes", energy, chans)
+                if elastic:
+                    cube.create(cube_file, "elastic", T_p, nc_chans)
+            cube.append(cube_file, "snowglobes", tm[indices], N)
+            totals = pd.DataFrame(N.sum(axis=1), columns=chans)
+            if elastic:
+                cube.append(cube_file, "elastic", tm[indices], nc.transpose(0, 2, 1))
+                for k, chan in enumerate(nc_chans):
+                    totals[chan] = nc[:, k].sum(axis=1)
+            totals.insert(0, "time", tm[indices])
+            mode = "a" if started else "w"
+            totals.to_csv(tot_file, sep=" ", index=False, mode=mode, header=not started)
+        started = True
+
+        for i, index in enumerate(indices):
+            events = {chan: N[i, :, j] for j, chan in enumerate(chans)}
+            if elastic:
+                events.update({chan: nc[i, k] for k, chan in enumerate(nc_chans)})
+            yield int(index), tm[index], events
+
+
+def rebinned_time_events(sn, detector, engine="native", save=True):
+    """Time series events summed from cached fine time bins.
+
+    Events are computed once with `time_events` at `base_t_bins` over the
+    model window (at `reference_distance` if `sn.rescale`) and a copy of its
+    `cube.cube_name` is cached under a `result_key` of the base bins.  Events
+    are linear in the time-integrated fluence, so any binning whose edges are
+    base bin edges is a sum of base bins.  Other binnings are computed with
+    `time_events`.
 
-    if not detector_simulated:
-        snowglobes.simulate(snowglobes_dir, sn.tar_file, detector_input=detector.name)
-        tables = snowglobes.collate(snowglobes_dir, sn.tar_file, skip_plots=True)
-        files = list(tables.keys())[1:]
-        j = -1
+    Parameters
+    ----------
+    sn : sspike.Supernova
+        Supernova simulation specifics.
+    detector: sspike.Detector
+        Detector information.
+    engine : str, default "native"
+        Engine of `time_events` for the base bins.
+    save : bool, default True
+        Save the summed counts and channel totals like `time_events`.
 
-    row_list = [[] for _ in range(sn.t_bins)]
-    header = tables[files[j]]["header"].split(" ")
-    energy = tables[files[j]]["data"][0]
+    Return
+    ------
+    counts : dict of pd.DataFrame
+        Events by channel with bin mid-times as index and energies as columns.
+    """
+    base = sn.with_bins(base_t_bins)
+    scale = 1.0
+    if rescaled(sn):
+        base = base.at_distance(reference_distance)
+        scale = distance_scale(sn)
+
+    # Base bin edge at or nearest each edge of the requested bins.
+    ts, tm, te = sn.bin_times()
+    edges = np.append(ts.to_value(units.s), te[-1].to_value(units.s))
+    dt = (base.t_end - base.t_start) / base_t_bins
+    index = np.rint((edges - base.t_start) / dt).astype(int)
+    aligned = np.all((index >= 0) & (index <= base_t_bins))
+    if not aligned or not np.allclose(base.t_start + index * dt, edges, atol=1e-6 * dt):
+        log.info(f"\n- {sn.bin_name} bins are not base bins; running time_events.\n")
+        return time_events(sn, detector, engine, save=save)
+
+    cube_file = _base_cube_file(base, detector, engine)
+    groups = _base_cube(cube_file, getmtime(cube_file))
+    for group, (t, _, _, _) in groups.items():
+        if len(t) != base_t_bins:
+            # E.g. overwritten by a stream_time_events run stopped early.
+            remove(cube_file)
+            msg = f"{cube_file} {group} has {len(t)} of {base_t_bins} time bins"
+            raise ValueError(msg)
 
     counts = {}
-    for chan in header[1:]:
-        counts[chan] = pd.DataFrame(0, index=tm.value, columns=energy)
+    for group, (_, energy, chans, N) in groups.items():
+        summed = np.add.reduceat(N[: index[-1]], index[:-1], axis=0) * scale
+        for j, chan in enumerate(chans):
+            counts[chan] = pd.DataFrame(summed[:, :, j], index=tm.value, columns=energy)
+
+    if save:
+        _save_time_events(sn, detector, counts)
+
+    return counts
+
+
+def _base_cube_file(base, detector, engine):
+    """Cached copy of the `time_events` cube of the base bins.
+
+    Parameters
+    ----------
+    base : sspike.Supernova
+        Supernova with `base_t_bins` time bins.
+    detector : sspike.Detector
+        Detector information.
+    engine : str
+        Engine of `time_events`.
+
+    Returns
+    -------
+    path : str
+        Cube file of all `base_t_bins` time bins for the current inputs.
+    """
+    path = f"{result_path('base_cube', result_key(base, detector, engine))}.h5"
+    if isfile(path):
+        return path
+
+    time_events(base, detector, engine)
+    folder = dirname(path)
+    makedirs(folder, exist_ok=True)
+    source = f"{detector.get_save_dir(base)}/{cube.cube_name}"
+    with open(source, "rb") as f:
+        with NamedTemporaryFile(dir=folder, suffix=".tmp", delete=False) as tmp:
+            copyfileobj(f, tmp)
+    replace(tmp.name, path)
+
+    return path
+
 
-    for file in files:
-        if "_smeared_weighted" not in file:
+@lru_cache(maxsize=2)
+def _base_cube(path, mtime):
+    """Groups of a base bin cube, kept in memory until the file changes."""
+    groups = cube.groups(path)
+    order = sorted(groups, key=lambda group: group != "snowglobes")
+
+    return {group: cube.read_group(path, group) for group in order}
+
+
+def _smeared_bins(tables, detector, indices=None):
+    """Smeared, weighted SNOwGLoBES tables for each time bin.
+
+    Parameters
+    ----------
+    tables : dict
+        Output of `snowglobes.collate`.
+    detector : sspike.Detector
+        Detector information.
+    indices : array of int, optional
+        Time bin of each fluence file in the tarball if not its file index.
+
+    Returns
+    -------
+    header : list of str
+        Column names, "Energy" followed by channels.
+    energy : np.array
+        Energy bins.
+    bins : dict of np.array
+        Table data (header, energy) by time bin.
+
+    Notes
+    -----
+    snewpy leaves the index out of the file name of a tarball with a single
+    time bin, so an unindexed file is file 0.
+    """
+    header, energy, bins = None, None, {}
+    for file in list(tables.keys())[1:]:
+        if "_smeared_weighted" not in file or detector.name not in file:
             continue
 
-        # I was saving everything in feather format, and maybe will again...?
-        # feather = f"{data_dir}/{file[:-4]}.feather"
-        df = pd.DataFrame(tables[file]["data"].T, columns=header)
-        # df.to_feather(feather)
+        suffix = file.split(f"_{detector.name}_")[0].split("_")[-1]
+        index = int(suffix) if suffix.isdigit() else 0
+        if indices is not None:
+            index = int(indices[index])
+        if header is None:
+            header = tables[file]["header"].split(" ")
+            energy = tables[file]["data"][0]
+        bins[index] = tables[file]["data"]
 
-        index = int(file.split(f"_{detector.name}_")[0].split("_")[-1])
-        row = [tm[index].value]
-        for chan in header[1:]:
-            row.append(np.sum(df[chan]))
-            counts[chan].iloc[index] = df[chan]
+    return header, energy, bins
 
-        row_list[index] = row
 
-    columns = ["time"] + header[1:]
-    totals = pd.DataFrame(row_list, columns=columns)
-    totals.to_csv(f"{save_dir}/chan_time.csv", sep=" ", index=False)
+def _snow_shard(sn, detector, indices, scratch):
+    """Run a shard of time bins through SNOwGLoBES in a scratch directory.
+
+    Parameters
+    ----------
+    sn : sspike.Supernova
+        Supernova simulation specifics.
+    detector : sspike.Detector
+        Detector information.
+    indices : array of int
+        Time bins in this shard.
+    scratch : str
+        Directory for the shard's tarball and SNOwGLoBES output.
+
+    Returns
+    -------
+    tuple
+        Output of `_smeared_bins` for the shard.
+    """
+    from snewpy import snowglobes
 
-    for chan in counts:
-        counts[chan].to_csv(f"{save_dir}/N_{chan}.csv", sep=" ")
+    ts, _, te = sn.bin_times()
+    if not isdir(scratch):
+        makedirs(scratch)
 
-    return counts
+    tarball = snowglobes.generate_fluence(
+        sn.sim_file,
+        sn.model,
+        sn.transform,
+        sn.distance,
+        output_filename=f"{sn.flu_name}-shard{indices[0]}",
+        tstart=ts[indices],
+        tend=te[indices],
+    )
+    tar_file = f"{scratch}/{basename(tarball)}"
+    move(tarball, tar_file)
+
+    snowglobes.simulate(snowglobes_tree(), tar_file, detector_input=detector.name)
+    tables = snowglobes.collate(snowglobes_tree(), tar_file, skip_plots=True)
+
+    return _smeared_bins(tables, detector, indices)
+
+
+def _sharded_bins(sn, detector, jobs):
+    """Smeared, weighted SNOwGLoBES tables from time bins run in parallel.
+
+    Parameters
+    ----------
+    sn : sspike.Supernova
+        Supernova simulation specifics.
+    detector : sspike.Detector
+        Detector information.
+    jobs : int
+        Number of worker processes (and shards).
+
+    Returns
+    -------
+    tuple
+        Output of `_smeared_bins` for all time bins.
+    """
+    shards = np.array_split(np.arange(sn.t_bins), min(jobs, sn.t_bins))
+    scratch = f"{detector.get_save_dir(sn)}/shards"
+    log.info(f"\nRunning {sn.t_bins} time bins in {len(shards)} shards.\n")
+
+    header, energy, bins = None, None, {}
+    with ProcessPoolExecutor(max_workers=len(shards)) as pool:
+        futures = [
+            pool.submit(_snow_shard, sn, detector, indices, f"{scratch}/{k}")
+            for k, indices in enumerate(shards)
+        ]
+        for future in futures:
+            header, energy, shard_bins = future.result()
+            bins.update(shard_bins)
+
+    rmtree(scratch, ignore_errors=True)
+
+    return header, energy, bins
+
+
+def recoil_energy():
+    """Proton recoil energy binning used by sspike.
+
+    Returns
+    -------
+    np.array
+        Proton recoil energies [GeV].
+    """
+    # Maximum proton recoil energy for 100 MeV neutrino is 17.5 MeV.
+    return np.arange(1e-4, 0.0176, 1e-4)
 
 
 def snow_energy():
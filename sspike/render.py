@@ -0,0 +1,132 @@
+"""Deferred plot rendering.
+
+With `--plots deferred`, simulations append plot jobs to a queue file
+instead of rendering figures on the compute path.  `sspike render` drains
+the queue later, optionally with several worker processes.
+"""
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+from os import getpid, rename, remove
+from os.path import isfile
+import json
+
+from .env import sspike_dir
+from .core.logging import getLogger
+
+log = getLogger(__name__)
+
+queue_file = f"{sspike_dir}/render-queue.jsonl"
+# Plot modes of `sspike --plots`.
+plot_modes = ["none", "deferred", "inline"]
+
+
+def enqueue(plot, run, path=queue_file):
+    """Append a plot job to the render queue.
+
+    Parameters
+    ----------
+    plot : str
+        Name of the `sspike.beer` plotting function.
+    run : tuple
+        (model, progenitor, transform, distance, detector).
+    path : str, default queue_file
+        Queue file.
+    """
+    line = json.dumps({"plot": plot, "run": list(run)}) + "\n"
+    # Appends of a single short line do not interleave between processes.
+    with open(path, "a") as f:
+        f.write(line)
+
+
+def render(plot, run):
+    """Render and save one plot.
+
+    Parameters
+    ----------
+    plot : str
+        Name of the `sspike.beer` plotting function.
+    run : tuple
+        (model, progenitor, transform, distance, detector).
+    """
+    from . import beer
+    from .supernova import Supernova
+    from .detectors import Detector
+
+    model, progenitor, transform, distance, detector = run
+    sn = Supernova(model, progenitor, transform, distance)
+    func = getattr(beer, plot)
+    if plot == "plot_luminosities":
+        func(sn, show=False)
+    else:
+        func(sn, Detector(detector), show=False)
+
+
+def drain(jobs=1, path=queue_file):
+    """Render every queued plot once.
+
+    Parameters
+    ----------
+    jobs : int, default 1
+        Worker processes.
+    path : str, default queue_file
+        Queue file.
+
+    Returns
+    -------
+    failed : int
+        Number of plots that failed; they are queued again.
+    """
+    if not isfile(path):
+        return 0
+
+    # New jobs go to a fresh queue file while this batch is rendered.
+    batch = f"{path}.{getpid()}"
+    rename(path, batch)
+    with open(batch) as f:
+        queued = [line for line in f if line.strip()]
+    entries = list(dict.fromkeys(queued))
+    log.info(f"\nRendering {len(entries)} plots.\n")
+
+    tasks = [json.loads(entry) for entry in entries]
+    failed = []
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(render, task["plot"], task["run"]) for task in tasks]
+        for entry, future in zip(entries, futures):
+            try:
+                future.result()
+            except Exception as exc:
+                log.error(f"\nRendering failed for {entry.strip()}: {exc}\n")
+                failed.append(entry)
+
+    if failed:
+        with open(path, "a") as f:
+            f.writelines(failed)
+    remove(batch)
+
+    return len(failed)
+
+
+def main(args=None):
+    """Command-line entry-point for `sspike render`.
+
+    Parameters
+    ----------
+    args : list of str, optional
+        Command line arguments after "render".
+
+    Returns
+    -------
+    int
+        Exit status, 1 if any plot failed.
+    """
+    parser = ArgumentParser(prog="sspike render", description="render queued plots")
+    parser.add_argument(
+        "-j", "--jobs", default=1, type=int, help="worker processes (default 1)"
+    )
+    cmdline = parser.parse_args(args)
+
+    failed = drain(cmdline.jobs)
+    if failed:
+        print(f"{failed} plots failed and were queued again.")
+
+    return int(failed > 0)
@@ -0,0 +1,170 @@
+"""Local HTTP server answering event rate queries.
+
+A long-lived process keeps snewpy models, cross-sections, SNOwGLoBES
+detector data, and response matrices in memory, so each query only does
+the physics.  Start it with `sspike serve` and send queries as JSON:
+
+    curl -d '{"model": "Nakazato_2013",
+              "progenitor": {"mass": 20, "metal": 0.02, "t_rev": 300},
+              "distance": 5.0}' http://127.0.0.1:8750/rates
+
+The response has event "totals" (records of `pnut.event_totals`) and
+"spectra" (columns of each SNOwGLoBES and sspike table).
+"""
+from argparse import ArgumentParser
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from functools import lru_cache
+from os.path import isfile
+import json
+
+from . import pnut, snow
+from .supernova import Supernova
+from .detectors import Detector
+from .core.logging import getLogger
+
+log = getLogger(__name__)
+
+# Query fields and their defaults (None if required).
+query_fields = {
+    "model": None,
+    "progenitor": None,
+    "distance": 5.0,
+    "transform": "NoTransformation",
+    "detector": "kamland",
+}
+
+
+def rates(query):
+    """Event totals and spectra for a rate query.
+
+    Parameters
+    ----------
+    query : dict
+        Keys of `query_fields`; missing optional fields use the defaults.
+
+    Returns
+    -------
+    result : dict
+        "totals" as a list of records and "spectra" as columns by table.
+    """
+    import snewpy.models.ccsn
+
+    unknown = set(query) - set(query_fields)
+    if unknown:
+        raise ValueError(f"Unknown query fields: {sorted(unknown)}")
+    params = {**query_fields, **query}
+    missing = [field for field, value in params.items() if value is None]
+    if missing:
+        raise ValueError(f"Missing query fields: {missing}")
+    if not isinstance(getattr(snewpy.models.ccsn, params["model"], None), type):
+        raise ValueError(f"Unknown model: {params['model']}")
+    pnut.flavor_transformation(params["transform"])
+    if params["detector"] not in snow.detectors():
+        raise ValueError(f"Unknown detector: {params['detector']}")
+
+    return _rates(
+        params["model"],
+        json.dumps(params["progenitor"], sort_keys=True),
+        params["transform"],
+        float(params["distance"]),
+        params["detector"],
+    )
+
+
+@lru_cache(maxsize=1024)
+def _rates(model, progenitor, transform, distance, detector):
+    try:
+        sn = Supernova(model, json.loads(progenitor), transform, distance)
+    except (KeyError, AttributeError) as exc:
+        raise ValueError(f"Unknown {model} progenitor: {progenitor}") from exc
+    if not isfile(sn.sim_file):
+        raise ValueError(f"No {model} model file for progenitor {progenitor}")
+    det = Detector(detector)
+
+    # Native SNOwGLoBES engine: no external processes or export files.
+    totals = pnut.event_totals(sn, det, save=False, engine="native")
+    tables = pnut.snowglobes_events(sn, det, save=False, engine="native")
+    tables.update(pnut.sspike_events(sn, det, save=False))
+
+    return {
+        "totals": totals.to_dict(orient="records"),
+        "spectra": {name: df.to_dict(orient="list") for name, df in tables.items()},
+    }
+
+
+class RateHandler(BaseHTTPRequestHandler):
+    """Answer POST /rates with the JSON of `rates`."""
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/rates":
+            self._reply(404, {"error": f"Unknown path {self.path}"})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            query = json.loads(self.rfile.read(length) or b"{}")
+            self._reply(200, rates(query))
+        except (ValueError, TypeError) as exc:
+            self._reply(400, {"error": str(exc)})
+        except Exception as exc:
+            log.exception(f"\nRate query failed: {exc}\n")
+            self._reply(500, {"error": f"{type(exc).__name__}: {exc}"})
+
+    def _reply(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        log.debug(f"\n{self.address_string()} {format % args}\n")
+
+
+def serve(host="127.0.0.1", port=8750):
+    """Run the rate server until interrupted.
+
+    Parameters
+    ----------
+    host : str, default "127.0.0.1"
+        Address to listen on.
+    port : int, default 8750
+        Port to listen on.
+    """
+    server = HTTPServer((host, port), RateHandler)
+    log.info(f"\nServing rates on http://{host}:{port}/rates\n")
+    print(f"Serving rates on http://{host}:{port}/rates")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main(args=None):
+    """Command-line entry-point for `sspike serve`.
+
+    Parameters
+    ----------
+    args : list of str, optional
+        Command line arguments after "serve".
+
+    Returns
+    -------
+    int
+        Exit status.
+    """
+    parser = ArgumentParser(prog="sspike serve", description="serve event rates")
+    parser.add_argument(
+        "--host", default="127.0.0.1", help="address to listen on (default local)"
+    )
+    parser.add_argument(
+        "-p", "--port", default=8750, type=int, help="port (default 8750)"
+    )
+    cmdline = parser.parse_args(args)
+
+    serve(cmdline.host, cmdline.port)
+
+    return 0
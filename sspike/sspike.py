@@ -24,26 +24,59 @@ eos : str, optional
     Nuclear equation of state.  Required for `Sukhbold_2015`.
 stir: str or float, optional
     Progenitor stirring parameter.  Required for `Warren_2020`.
+jobs : int, optional
+    Worker processes for simulation files.  Default 1 (in series).
+until : str, optional
+    Last stage to run (see `sspike.stages`).  Default all stages.
+plots : str, optional
+    Plot rendering: `inline`, `deferred` (queued for `sspike render`), or
+    `none`.  Default `inline`.
+
+Commands
+--------
+convert FILE
+    Convert the model files of a simulations dictionary (`sspike.convert`).
+serve [--host HOST] [-p PORT]
+    Answer rate queries over local HTTP (`sspike.serve`).
+render [-j JOBS]
+    Render plots queued by `--plots deferred` (`sspike.render`).
+catalog FILE [-u STAGE] [--missing] [--forget]
+    List completed and missing stages of a sweep (`sspike.catalog`).
 
 Note
 ----
 Supernova model and detector must be included in `snewpy` and `SNOwGLoBES`.
 """
 from argparse import ArgumentParser  # TODO: output files using FileType
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from importlib import import_module
+from time import perf_counter
+import traceback
 import json
+import sys
 import itertools
 
-from sspike import pnut
-from sspike import beer
-from sspike.supernova import Supernova
-from sspike.detectors import Detector
+from .stages import stages, run_stages
+from .render import plot_modes
 from .core.logging import getLogger, initialize_logging
 from ._version import __version__
 
 log = getLogger(__name__)
 
+# Modules of commands with their own arguments, e.g. `sspike convert FILE`.
+commands = {
+    "convert": "sspike.convert",
+    "serve": "sspike.serve",
+    "render": "sspike.render",
+    "catalog": "sspike.catalog",
+}
+
 
 def main():
+    args = sys.argv[1:]
+    if args and args[0] in commands:
+        return import_module(commands[args[0]]).main(args[1:])
+
     # Description for -h, --help flag.
     description = "simulated supernovae products inducing KamLAND events"
 
@@ -111,6 +144,29 @@ def main():
     parser.add_argument(
         "-f", "--file", metavar="", help="file path to simulations dictionary"
     )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        default=1,
+        metavar="",
+        type=int,
+        help="worker processes for simulation files (default 1)",
+    )
+    parser.add_argument(
+        "-u",
+        "--until",
+        choices=list(stages),
+        metavar="",
+        help=f"last stage to run: {', '.join(stages)} (default all)",
+    )
+    parser.add_argument(
+        "-p",
+        "--plots",
+        default="inline",
+        choices=plot_modes,
+        metavar="",
+        help=f"plot rendering: {', '.join(plot_modes)} (default inline)",
+    )
     parser.add_argument("-v", "--version", action="version", version=__version__)
     parser.add_argument(
         "-d", "--debug", action="store_true", help="include all messages in log file"
@@ -169,58 +225,67 @@ def main():
     log.debug(prog_msg)
 
     # Physics!!!
+    exit_code = 0
     # Model name for single simulation.
     if "." not in model:
         print(f"Starting simulation: {model} \t {progenitor}.")
-        run_sim(model, progenitor, transform, distance, detector)
+        run_sim(
+            model,
+            progenitor,
+            transform,
+            distance,
+            detector,
+            cmdline.until,
+            plots=cmdline.plots,
+        )
 
     # File name for (multiple) simulation(s).
     else:
-        with open(model, "r") as f:
-            info = json.load(f)
-
-        # List of (model-type, progenitor) tuples.
-        sims = []
-        for sim in info["sim"]:
-            for pair in itertools.product(sim["model"], sim["progenitor"]):
-                sims.append(pair)
-
-        # List of (distance, transform, detector) tuples.
-        params = itertools.product(
-            info["transform"], info["distance"], info["detector"]
-        )
-
-        # List of each simulation file with each set of parameters.
-        runs = itertools.product(sims, params)
-
-        # Run simulations in series.
-        for run in runs:
-            model = run[0][0]
-            progenitor = run[0][1]
-            transform = run[1][0]
-            distance = run[1][1]
-            detector = run[1][2]
-            description = (
-                f"\tModel: {model}\n"
-                f"\tProgenitor: {progenitor}\n"
-                f"\tDistance: {distance} kpc\n"
-                f"\tDetector: {detector}\n"
-            )
+        runs = read_runs(model)
+
+        # Run simulations in parallel.
+        if cmdline.jobs > 1:
+            summary = run_sweep(runs, cmdline.jobs, cmdline.until, cmdline.plots)
+            print(summary.to_string(index=False))
+            failed = (summary["status"] != "done").sum()
+            if failed:
+                print(f"{failed} of {len(runs)} simulations failed.")
+                exit_code = 1
+
+        # Run simulations in series, sharing stages between them.
+        else:
+            for model, progenitor, transform, distance, detector in runs:
+                description = (
+                    f"\tModel: {model}\n"
+                    f"\tProgenitor: {progenitor}\n"
+                    f"\tDistance: {distance} kpc\n"
+                    f"\tDetector: {detector}\n"
+                )
+                print(f"Simulation:\n {description}")
 
             # PHYSICS!!!
-            print(f"Starting simulation:\n {description}")
-            run_sim(model, progenitor, transform, distance, detector)
-            print("\nSimulation complete.\n")
+            print(f"Starting {len(runs)} simulations.")
+            run_stages(runs, cmdline.until, plots=cmdline.plots)
+            print("\nSimulations complete.\n")
 
     # End of main()
     log.debug("\n****\nsspike.main complete.\n****\n")
 
     print("Job's done.")
 
-    return 0
+    return exit_code
 
 
-def run_sim(model, progenitor, transform, distance, detector):
+def run_sim(
+    model,
+    progenitor,
+    transform,
+    distance,
+    detector,
+    until=None,
+    done=None,
+    plots="inline",
+):
     """Process simulation file with `SNoGLoBES` and `sspike`.
 
     Parameters
@@ -235,8 +300,17 @@ def run_sim(model, progenitor, transform, distance, detector):
         Distance to supernova.
     detector : str
         Name of detector in `SNOwGLoBEs`.
-    t_bins : int
-        Number of time bins to divide simulation
+    until : str, optional
+        Last stage to run from `sspike.stages`.  Default all stages.
+    done : set of str, optional
+        Stage nodes already run (see `sspike.stages.run_stages`).
+    plots : {"inline", "deferred", "none"}, default "inline"
+        Render plots now, queue them for `sspike render`, or skip them.
+
+    Returns
+    -------
+    done : set of str
+        Stage nodes run, including `done`.
     """
     # Log initial supernovae information.
     sn_info = f"\n- Running {model} model at {distance} kpc in {detector}.\n"
@@ -245,32 +319,132 @@ def run_sim(model, progenitor, transform, distance, detector):
         sn_info += f"\t- {key}: {progenitor[key]}\n"
     log.info(sn_info)
 
-    # Load model.
-    log.debug("\n- Intializing Supernova.\n")
-    sn = Supernova(model, progenitor, transform, distance)
+    # Luminosity, fluence, SNOwGLoBES, sspike, totals, and visible totals.
+    run = (model, progenitor, transform, distance, detector)
+    return run_stages([run], until, done, plots)
 
-    # Detector string to class.
-    log.debug(f"\n- Initializing detector: {detector}.\n")
-    detector = Detector(detector)
 
-    # Save luminosities.
-    beer.plot_luminosities(sn, show=False)
+def run_sweep(runs, jobs, until=None, plots="inline"):
+    """Process simulations with a pool of worker processes.
 
-    # Process with SNOwGLoBES.
-    log.debug("\n- Processing with SNOwGLoBES .\n")
-    pnut.snowglobes_events(sn, detector)
-    beer.plot_snowglobes_events(sn, detector, show=False)
+    Runs sharing a model and progenitor write to the same supernova directory
+    (luminosities, fluences), so each such group goes to a single worker and
+    is processed in series there.  Groups never share output directories.
 
-    # Process with sspike.
-    if detector.name == "kamland":
-        log.debug("\n- Processing with sspike.\n")
-        pnut.sspike_events(sn, detector)
-        beer.plot_sspike_events(sn, detector, show=False)
+    Parameters
+    ----------
+    runs : list of tuple
+        (model, progenitor, transform, distance, detector) for `run_sim`.
+    jobs : int
+        Number of worker processes.
+    until : str, optional
+        Last stage to run from `sspike.stages`.  Default all stages.
+    plots : {"inline", "deferred", "none"}, default "inline"
+        Plot rendering of each run (see `run_sim`).
+
+    Returns
+    -------
+    summary : pd.DataFrame
+        One row per run with its parameters, status ("done" or "failed"),
+        run time [s], and error message.
+    """
+    import pandas as pd
+
+    groups = {}
+    for run in runs:
+        key = (run[0], json.dumps(run[1], sort_keys=True))
+        groups.setdefault(key, []).append(run)
+    log.info(f"\n- Running {len(runs)} simulations in {len(groups)} groups.\n")
+
+    records = []
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [
+            pool.submit(_run_group, group, until, plots) for group in groups.values()
+        ]
+        for future in as_completed(futures):
+            for record in future.result():
+                print(
+                    f"{record['status']}: {record['model']} {record['progenitor']}"
+                    f" {record['distance']} kpc {record['detector']}"
+                )
+                records.append(record)
+
+    # Summary in the order of the simulation file.
+    order = {run_id(*run): i for i, run in enumerate(runs)}
+    records.sort(key=lambda record: order[record["run_id"]])
+    for record in records:
+        del record["run_id"]
+
+    return pd.DataFrame(records)
+
+
+def read_runs(path):
+    """Runs of a simulations dictionary file.
+
+    Parameters
+    ----------
+    path : str
+        JSON file with "sim" (lists of "model" and "progenitor"), "transform",
+        "distance", and "detector" lists.
+
+    Returns
+    -------
+    runs : list of tuple
+        (model, progenitor, transform, distance, detector) for each run.
+    """
+    with open(path, "r") as f:
+        info = json.load(f)
+
+    # List of (model-type, progenitor) tuples.
+    sims = []
+    for sim in info["sim"]:
+        for pair in itertools.product(sim["model"], sim["progenitor"]):
+            sims.append(pair)
 
-    # Tabulate results
-    log.debug("\n- Tabulating results.\n")
-    beer.bar_totals(sn, detector, show=False)
+    # List of (distance, transform, detector) tuples.
+    params = itertools.product(info["transform"], info["distance"], info["detector"])
+
+    # List of each simulation file with each set of parameters.
+    return [
+        (sim[0], sim[1], param[0], param[1], param[2])
+        for sim, param in itertools.product(sims, params)
+    ]
+
+
+def run_id(model, progenitor, transform, distance, detector):
+    """Unique identifier of a `run_sim` parameter set."""
+    return json.dumps(
+        [model, progenitor, transform, float(distance), detector], sort_keys=True
+    )
+
+
+def _run_group(runs, until=None, plots="inline"):
+    """Process runs in series, capturing errors instead of raising them."""
+    records = []
+    done = set()
+    for run in runs:
+        start = perf_counter()
+        status, error = "done", ""
+        try:
+            run_sim(*run, until=until, done=done, plots=plots)
+        except Exception as exc:
+            status = "failed"
+            error = f"{type(exc).__name__}: {exc}"
+            log.error(f"\n- {run} failed:\n{traceback.format_exc()}\n")
+
+        model, progenitor, transform, distance, detector = run
+        records.append(
+            {
+                "run_id": run_id(*run),
+                "model": model,
+                "progenitor": progenitor,
+                "transform": transform,
+                "distance": distance,
+                "detector": detector,
+                "status": status,
+                "time": round(perf_counter() - start, 2),
+                "error": error,
+            }
+        )
 
-    # Keep visible results
-    log.debug("\n- Visible results.\n")
-    beer.bar_vis(sn, detector, show=False)
+    return records
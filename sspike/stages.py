@@ -0,0 +1,403 @@
+"""Simulation stages and a scheduler for running them.
+
+Each stage of `run_sim` declares the stages it needs and which simulation
+parameters identify its outputs.  Runs that share those parameters share the
+stage, so a sweep computes it once.
+"""
+from time import perf_counter
+import json
+
+from . import render, catalog, dataset
+from .env import output_formats
+from .core.logging import getLogger
+
+log = getLogger(__name__)
+
+# Simulation parameters identifying the outputs of a stage of each scope.
+scopes = {
+    "progenitor": ("model", "progenitor"),
+    "supernova": ("model", "progenitor", "transform", "distance"),
+    "detector": ("model", "progenitor", "transform", "distance", "detector"),
+}
+run_keys = ("model", "progenitor", "transform", "distance", "detector")
+
+
+class Stage:
+    """Step of a simulation.
+
+    Parameters
+    ----------
+    name : str
+        Stage name.
+    func : callable
+        Called as func(sn, detector) to produce the stage outputs.
+    inputs : tuple of str
+        Names of stages that must run first.
+    scope : str
+        Key of `scopes`: parameters the stage outputs depend on.
+    outputs : callable
+        Called as outputs(sn, detector) for a list of output file paths.
+    plot : str, optional
+        Name of the `sspike.beer` function plotting the stage outputs.
+
+    Notes
+    -----
+    All parameters are also attributes.
+    """
+
+    def __init__(self, name, func, inputs, scope, outputs, plot=None):
+        self.name = name
+        self.func = func
+        self.inputs = inputs
+        self.scope = scope
+        self.outputs = outputs
+        self.plot = plot
+
+    def key(self, run):
+        """Node identifier of this stage for a run.
+
+        Parameters
+        ----------
+        run : tuple
+            (model, progenitor, transform, distance, detector).
+
+        Returns
+        -------
+        key : str
+            Stage name and the run parameters in its scope.
+        """
+        params = dict(zip(run_keys, run))
+        params["distance"] = float(params["distance"])
+        values = [params[param] for param in scopes[self.scope]]
+
+        return json.dumps([self.name] + values, sort_keys=True)
+
+
+# Stage functions import the physics modules when first run.
+def _luminosity(sn, detector):
+    from . import pnut
+
+    pnut.get_luminosities(sn)
+
+
+def _fluence(sn, detector):
+    from astropy import units
+    from . import pnut
+
+    # Rescaled supernovae reuse the reference distance fluences.
+    if not pnut.rescaled(sn) and not pnut.tarball_current(sn):
+        t_start = sn.t_start * units.s
+        pnut.fluence_tarball(sn, t_start=t_start, t_end=sn.t_end * units.s)
+    pnut.fluence_store(sn)
+
+
+def _fluence_outputs(sn, detector):
+    from . import pnut
+
+    # Rescaled supernovae have no tarball of their own.
+    if pnut.rescaled(sn):
+        return [pnut.fluence_path(sn)]
+
+    return [sn.tar_file, pnut.fluence_path(sn)]
+
+
+def _snowglobes(sn, detector):
+    from . import pnut
+
+    pnut.snowglobes_events(sn, detector)
+
+
+def _sspike(sn, detector):
+    from . import pnut
+
+    if detector.name == "kamland":
+        pnut.sspike_events(sn, detector)
+
+
+def _totals(sn, detector):
+    from . import pnut
+
+    pnut.event_totals(sn, detector)
+
+
+def _vis(sn, detector):
+    from . import pnut
+
+    pnut.vis_totals(sn, detector)
+
+
+def _exports(tables, csv, detector=True):
+    """Outputs of a stage in each format of `env.output_formats`.
+
+    Parameters
+    ----------
+    tables : list of str
+        `sspike.dataset` tables of the stage.
+    csv : callable
+        CSV file or directory of the stage for a supernova and detector.
+    detector : bool, default True
+        Whether the tables are partitioned by detector.
+
+    Returns
+    -------
+    outputs : callable
+        Output paths for a supernova and detector.
+    """
+
+    def outputs(sn, det):
+        formats = output_formats.split()
+        paths = []
+        if "parquet" in formats:
+            part = det if detector else None
+            paths += [dataset.partition_dir(table, sn, part) for table in tables]
+        if "csv" in formats:
+            paths.append(csv(sn, det))
+
+        return paths
+
+    return outputs
+
+
+def _sspike_outputs(sn, det):
+    # sspike events are only computed for KamLAND.
+    if det.name != "kamland":
+        return []
+    exports = _exports(
+        ["sspike-basic", "sspike-elastic"],
+        lambda sn, det: f"{det.get_save_dir(sn)}/sspike-files",
+    )
+
+    return exports(sn, det)
+
+
+# Stages in dependency order.
+stages = {
+    "luminosity": Stage(
+        "luminosity",
+        _luminosity,
+        (),
+        "progenitor",
+        _exports(["luminosity"], lambda sn, det: sn.lum_file, detector=False),
+        "plot_luminosities",
+    ),
+    "fluence": Stage(
+        "fluence",
+        _fluence,
+        (),
+        "supernova",
+        _fluence_outputs,
+    ),
+    "snowglobes": Stage(
+        "snowglobes",
+        _snowglobes,
+        ("fluence",),
+        "detector",
+        _exports(
+            [
+                "snow-unsmeared_unweighted",
+                "snow-unsmeared_weighted",
+                "snow-smeared_unweighted",
+                "snow-smeared_weighted",
+            ],
+            lambda sn, det: f"{det.get_save_dir(sn)}/snow-files",
+        ),
+        "plot_snowglobes_events",
+    ),
+    "sspike": Stage(
+        "sspike",
+        _sspike,
+        ("fluence",),
+        "detector",
+        _sspike_outputs,
+        "plot_sspike_events",
+    ),
+    "totals": Stage(
+        "totals",
+        _totals,
+        ("snowglobes", "sspike"),
+        "detector",
+        _exports(
+            ["totals_all"], lambda sn, det: f"{det.get_save_dir(sn)}/totals_all_0.csv"
+        ),
+        "bar_totals",
+    ),
+    "vis": Stage(
+        "vis",
+        _vis,
+        ("totals",),
+        "detector",
+        _exports(
+            ["totals_vis"], lambda sn, det: f"{det.get_save_dir(sn)}/totals_vis_0.csv"
+        ),
+        "bar_vis",
+    ),
+}
+
+
+def required(until=None):
+    """Names of the stages needed for a target stage, in dependency order.
+
+    Parameters
+    ----------
+    until : str, optional
+        Final stage to run.  All stages if None.
+
+    Returns
+    -------
+    names : list of str
+    """
+    if until is None:
+        return list(stages)
+    if until not in stages:
+        raise ValueError(f"Unknown stage {until}; choose from {list(stages)}")
+
+    names = set()
+    pending = [until]
+    while pending:
+        name = pending.pop()
+        names.add(name)
+        pending.extend(stages[name].inputs)
+
+    return [name for name in stages if name in names]
+
+
+def plan(runs, until=None):
+    """Stage nodes for a list of runs, each shared node listed once.
+
+    Parameters
+    ----------
+    runs : list of tuple
+        (model, progenitor, transform, distance, detector) for each run.
+    until : str, optional
+        Final stage to run.  All stages if None.
+
+    Returns
+    -------
+    nodes : list of (str, str, tuple)
+        Node key, stage name, and the first run needing the node, ordered so
+        every node follows its inputs.
+    """
+    nodes = {}
+    for name in required(until):
+        for run in runs:
+            key = stages[name].key(run)
+            if key not in nodes:
+                nodes[key] = (key, name, run)
+
+    return list(nodes.values())
+
+
+def node_inputs(nodes):
+    """Hashes of the current inputs of each stage node.
+
+    Parameters
+    ----------
+    nodes : list of (str, str, tuple)
+        Output of `plan`.
+
+    Returns
+    -------
+    inputs : dict of dict
+        `_inputs` of each node by node key, as recorded in the catalog.
+    """
+    from .supernova import Supernova
+    from .detectors import Detector
+
+    inputs = {}
+    for key, name, run in nodes:
+        model, progenitor, transform, distance, detector = run
+        sn = Supernova(model, progenitor, transform, distance)
+        inputs[key] = _inputs(stages[name], sn, Detector(detector))
+
+    return inputs
+
+
+def run_stages(
+    runs, until=None, done=None, plots="inline", catalog_file=catalog.catalog_file
+):
+    """Run the stages of a list of simulations.
+
+    Parameters
+    ----------
+    runs : list of tuple
+        (model, progenitor, transform, distance, detector) for each run.
+    until : str, optional
+        Final stage to run.  All stages if None.
+    done : set of str, optional
+        Keys of nodes already run, updated in place and skipped.
+    plots : {"inline", "deferred", "none"}, default "inline"
+        Render stage plots as each stage runs, queue them for `sspike render`,
+        or skip them.
+    catalog_file : str or None, default catalog.catalog_file
+        Run catalog: nodes it lists are skipped and completed nodes are added.
+        None to neither read nor update a catalog.
+
+    Returns
+    -------
+    done : set of str
+        Keys of all nodes run or found in the catalog.
+    """
+    from .supernova import Supernova
+    from .detectors import Detector
+
+    if done is None:
+        done = set()
+
+    nodes = plan(runs, until)
+    # Completed nodes are found without touching the output directories.
+    if catalog_file is not None:
+        keys = [key for key, _, _ in nodes]
+        done |= catalog.completed(keys, catalog_file, node_inputs(nodes))
+
+    for key, name, run in nodes:
+        if key in done:
+            continue
+
+        model, progenitor, transform, distance, detector = run
+        log.debug(f"\n- Stage {name}: {key}\n")
+        sn = Supernova(model, progenitor, transform, distance)
+        det = Detector(detector)
+        start = perf_counter()
+        stages[name].func(sn, det)
+        seconds = perf_counter() - start
+        done.add(key)
+        if catalog_file is not None:
+            _record(stages[name], key, run, sn, det, seconds, catalog_file)
+
+        plot = stages[name].plot
+        if plot is None or plots == "none":
+            continue
+        # sspike events are only computed for KamLAND.
+        if name == "sspike" and detector != "kamland":
+            continue
+        if plots == "deferred":
+            render.enqueue(plot, run)
+        else:
+            render.render(plot, run)
+
+    return done
+
+
+def _record(stage, key, run, sn, det, seconds, path):
+    """Add a completed stage node to the run catalog."""
+    params = dict(zip(run_keys, run))
+    params["distance"] = float(params["distance"])
+    params = {param: params[param] for param in scopes[stage.scope]}
+
+    outputs = stage.outputs(sn, det)
+    inputs = _inputs(stage, sn, det)
+    catalog.record(key, stage.name, params, outputs, inputs, seconds, path)
+
+
+def _inputs(stage, sn, det):
+    """Hashes of the model file and of all inputs in the stage scope."""
+    from . import pnut
+
+    detector = det if stage.scope == "detector" else None
+    scope = "progenitor" if stage.scope == "progenitor" else "supernova"
+
+    return {
+        "model": pnut.model_digest(sn.sim_file),
+        "result": pnut.result_key(sn, detector, scope=scope),
+        "formats": output_formats,
+    }
@@ -34,6 +34,9 @@ class Supernova:
         Start time for simulation if not earliest model time.
     t_end : float, optional
         End time for simulation if not latest model time.
+    rescale : bool, default True
+        Let pnut scale rates from `pnut.reference_distance` by 1/d^2 instead
+        of regenerating fluences and rerunning SNOwGLoBES at `distance`.
 
     Attributes
     ----------
@@ -73,7 +76,15 @@ class Supernova:
     """
 
     def __init__(
-        self, model, progenitor, transform, distance, t_bins=1, t_start=None, t_end=None
+        self,
+        model,
+        progenitor,
+        transform,
+        distance,
+        t_bins=1,
+        t_start=None,
+        t_end=None,
+        rescale=True,
     ):
         # Simulation properties.
         self.model = model
@@ -82,6 +93,7 @@ class Supernova:
         self.xform = self._xform(transform)
         self.distance = float(distance)
         self.t_bins = t_bins
+        self.rescale = rescale
         # Model/simulation specific variables.
         self.model_dir = f"{models_dir}/{self.model}"
         self._simulation_settings()
@@ -109,6 +121,58 @@ class Supernova:
             f"{self.bin_dir}/fluence/{self.flu_name}_{i}.dat" for i in range(t_bins)
         ]
 
+    def at_distance(self, distance):
+        """Same supernova at another distance.
+
+        Parameter
+        ---------
+        distance : float
+            Distance to supernova in kpc.
+
+        Return
+        ------
+        sn : sspike.Supernova
+            Copy with `distance` and the matching directories.
+        """
+        return Supernova(
+            self.model,
+            self.progenitor,
+            self.transform,
+            distance,
+            self.t_bins,
+            self.t_start,
+            self.t_end,
+            self.rescale,
+        )
+
+    def with_bins(self, t_bins, t_start=None, t_end=None):
+        """Same supernova with another time binning.
+
+        Parameters
+        ----------
+        t_bins : int
+            Number of time bins.
+        t_start : float, optional
+            Start time [s].  Model start time if None.
+        t_end : float, optional
+            End time [s].  Model end time if None.
+
+        Return
+        ------
+        sn : sspike.Supernova
+            Copy with the binning and the matching directories.
+        """
+        return Supernova(
+            self.model,
+            self.progenitor,
+            self.transform,
+            self.distance,
+            t_bins,
+            t_start,
+            t_end,
+            self.rescale,
+        )
+
     def _xform(self, transform):
         """Transformation abbreviation for directories and plots.
 
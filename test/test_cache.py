@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+
+from sspike.core.cache import digest, file_digest, save_npy, load_npy
+from sspike.core.cache import save_frames, load_frames, save_arrays, load_arrays
+
+
+def test_digest():
+    x = np.arange(5.0)
+    assert digest(x, 1) == digest(x.copy(), 1)
+    assert digest(x, 1) != digest(x, 2)
+    assert digest("ab", "c") != digest("a", "bc")
+
+
+def test_save_load_npy(tmp_path):
+    x = np.linspace(0, 1, 11)
+    path = f"{tmp_path}/cache/x.npy"
+    save_npy(path, x)
+    y = load_npy(path)
+    assert isinstance(y, np.memmap)
+    assert np.array_equal(x, y)
+
+
+def test_file_digest(tmp_path):
+    path = f"{tmp_path}/a.txt"
+    with open(path, "w") as f:
+        f.write("1 2 3")
+    key = file_digest(path)
+    assert len(key) == 16
+    with open(path, "w") as f:
+        f.write("1 2 4")
+    assert file_digest(path) != key
+
+
+def test_save_load_frames(tmp_path):
+    frames = {"b": pd.DataFrame({"x": [1.0, 2.0]}), "a": pd.DataFrame({"y": [3]})}
+    path = f"{tmp_path}/results/key"
+    save_frames(path, frames)
+    # A second publish of the same key keeps the first copy.
+    save_frames(path, {"c": pd.DataFrame()})
+    loaded = load_frames(path)
+    assert list(loaded) == ["b", "a"]
+    assert loaded["b"].equals(frames["b"])
+
+
+def test_save_load_arrays(tmp_path):
+    path = f"{tmp_path}/arrays"
+    save_arrays(path, {"x": np.arange(3)}, {"source": "a"})
+    save_arrays(path, {"y": np.arange(4)}, {"source": "b"})
+    arrays, meta = load_arrays(path)
+    assert list(arrays) == ["y"]
+    assert meta == {"source": "b"}
@@ -0,0 +1,34 @@
+from sspike import catalog, stages
+
+progenitor = {"mass": 20, "metal": 0.02, "t_rev": 300}
+runs = [
+    ("Nakazato_2013", progenitor, "NoTransformation", distance, "kamland")
+    for distance in [10.0, 5.0]
+]
+
+
+def test_record_completed(tmp_path):
+    path = f"{tmp_path}/catalog.sqlite"
+    assert catalog.completed(["a"], path) == set()
+
+    key = stages.stages["fluence"].key(runs[0])
+    params = dict(zip(stages.scopes["supernova"], runs[0]))
+    output = tmp_path / "fluence.npy"
+    output.write_bytes(b"0" * 10)
+    catalog.record(key, "fluence", params, [str(output)], {"model": "x"}, 1.5, path)
+    assert catalog.completed([key, "a"], path) == {key}
+
+    # Nodes recorded with other inputs or missing outputs run again.
+    inputs = {node: {"model": "x"} for node, _, _ in stages.plan(runs, "fluence")}
+    assert catalog.completed([key], path, inputs) == {key}
+    assert catalog.completed([key], path, {key: {"model": "y"}}) == set()
+
+    df = catalog.status(runs, "fluence", path, inputs)
+    assert df["done"].tolist() == [True, False]
+    assert df["bytes"][0] == 10
+
+    output.unlink()
+    assert catalog.completed([key], path, inputs) == set()
+
+    catalog.forget([key], path)
+    assert catalog.completed([key], path) == set()
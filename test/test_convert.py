@@ -0,0 +1,23 @@
+import numpy as np
+from astropy import units
+from snewpy.neutrino import Flavor
+
+from sspike.convert import StoredModel, store_energy
+from sspike.core.cache import save_arrays
+
+
+def test_StoredModel(tmp_path):
+    time = np.array([0.0, 1.0, 2.0])
+    spectra = np.ones((3, len(Flavor), len(store_energy)))
+    spectra *= np.array([1.0, 2.0, 4.0])[:, None, None]
+    path = f"{tmp_path}/models/Test/test.dat"
+    arrays = {"time": time, "energy": store_energy, "spectra": spectra}
+    save_arrays(path, arrays, {"source": "test.dat"})
+
+    model = StoredModel(path)
+    assert np.array_equal(model.get_time().value, time)
+    E = store_energy * units.MeV
+    spec = model.get_initial_spectra(1.0 * units.s, E)
+    assert np.allclose(spec[Flavor.NU_E].value, 2.0)
+    spec = model.get_initial_spectra(1.5 * units.s, [10.1, 200] * units.MeV)
+    assert np.allclose(spec[Flavor.NU_X_BAR].value, [3.0, 0.0])
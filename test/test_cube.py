@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+
+from sspike import cube
+
+time = np.linspace(0.05, 9.95, 100)
+energy = np.linspace(0.0005, 0.0995, 200)
+counts = np.random.default_rng(0).random((100, 200, 2))
+
+
+def test_write_read(tmp_path):
+    path = f"{tmp_path}/{cube.cube_name}"
+    cube.write(path, "snowglobes", time, energy, ["ibd", "e"], counts)
+    cube.write(path, "elastic", time, energy[:10], ["nc_p"], counts[:, :10, :1])
+    assert cube.groups(path) == {"elastic": ["nc_p"], "snowglobes": ["ibd", "e"]}
+
+    df = cube.read(path, "e", t_range=(1.0, 2.0), e_range=(0.01, 0.02))
+    t_in = (time >= 1.0) & (time <= 2.0)
+    e_in = (energy >= 0.01) & (energy <= 0.02)
+    assert np.array_equal(df.index, time[t_in])
+    assert np.array_equal(df.to_numpy(), counts[t_in][:, e_in, 1])
+    assert cube.read(path, "nc_p").shape == (100, 10)
+
+    t, E, chans, N = cube.read_group(path, "snowglobes")
+    assert chans == ["ibd", "e"] and np.array_equal(N, counts)
+
+    with pytest.raises(KeyError):
+        cube.read(path, "nc")
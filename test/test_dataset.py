@@ -0,0 +1,49 @@
+from types import SimpleNamespace
+
+import pandas as pd
+
+from sspike import dataset
+
+
+def supernova(distance):
+    return SimpleNamespace(
+        model="Nakazato_2013",
+        sn_name="N13-20-20-300",
+        transform="NoTransformation",
+        distance=distance,
+        bin_name="b1s-0.05e20.0",
+    )
+
+
+def test_write_read(tmp_path):
+    root = str(tmp_path)
+    kamland = SimpleNamespace(name="kamland")
+    scint = SimpleNamespace(name="scint20kt")
+    for distance in [10.0, 5.0]:
+        df = pd.DataFrame({"Energy": [0.01, 0.02], "ibd": [1 / distance, 2.0]})
+        dataset.write("snow", df, supernova(distance), kamland, 0, root)
+    df = pd.DataFrame({"Energy": [0.01], "nc": [3.0]})
+    dataset.write("snow", df, supernova(10.0), scint, 0, root)
+    # Rewriting a result replaces it.
+    dataset.write("snow", df, supernova(10.0), scint, 0, root)
+
+    assert dataset.tables(root) == ["snow"]
+    assert len(dataset.read("snow", root=root)) == 5
+
+    near = dataset.read("snow", filters=[("distance", "==", 5.0)], root=root)
+    assert near["ibd"].tolist() == [0.2, 2.0]
+    assert set(near["detector"]) == {"kamland"}
+
+    # Channels of other detectors are null.
+    scint = dataset.read("snow", ["ibd", "nc"], [("detector", "==", "scint20kt")], root)
+    assert scint["ibd"].isna().all() and scint["nc"].tolist() == [3.0]
+
+
+def test_progenitor_partition(tmp_path):
+    root = str(tmp_path)
+    lum = pd.DataFrame({"time": [0.0, 1.0], "NU_E": [1e52, 2e52]})
+    dataset.write("luminosity", lum, supernova(10.0), root=root)
+
+    df = dataset.read("luminosity", root=root)
+    assert df["progenitor"].tolist() == ["N13-20-20-300"] * 2
+    assert df["distance"].isna().all()
@@ -7,3 +7,10 @@ def test_Detector():
     assert detector.N_p == 6.02582603699751e31
     assert detector.N_e == 2.438651797172892e32
     assert detector.low_cut == 2e-4
+
+
+def test_Detector_quenching():
+    detector = Detector("kamland", quenching="birks", kB=0.01)
+    assert detector.quenching == "birks"
+    assert detector.kB == 0.01
+    assert Detector("kamland").quenching == "kamland"
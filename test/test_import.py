@@ -0,0 +1,28 @@
+import json
+import subprocess
+import sys
+
+# Modules that must not be loaded just by importing an sspike module.
+heavy = ["snewpy", "matplotlib", "plotly", "scipy.integrate"]
+
+
+def loaded_after(module, modules=heavy):
+    """Which of `modules` importing `module` loads in a fresh interpreter."""
+    code = (
+        "import json, sys\n"
+        f"import {module}\n"
+        f"print(json.dumps([m for m in {modules!r} if m in sys.modules]))\n"
+    )
+    out = subprocess.check_output([sys.executable, "-c", code])
+
+    return json.loads(out)
+
+
+def test_cli_import():
+    for module in ["sspike", "sspike.sspike"]:
+        assert loaded_after(module, ["snewpy", "scipy", "matplotlib"]) == [], module
+
+
+def test_library_import():
+    for module in ["sspike.pnut", "sspike.beer", "sspike.supernova"]:
+        assert loaded_after(module) == [], module
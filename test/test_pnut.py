@@ -1,4 +1,7 @@
 from math import isclose
+from os import makedirs, path
+
+import numpy as np
 
 from sspike.supernova import Supernova
 from sspike.detectors import Detector
@@ -11,6 +14,34 @@ distance = 5.0
 sn = Supernova(model, progenitor, transformation, distance)
 detector = Detector("kamland")
 
+# Smooth synthetic fluence on the snewpy energy grid for integration checks.
+E_flu = np.linspace(0, 0.1, 501)
+f_flu = 1e9 * E_flu ** 2 / (1 + np.exp(E_flu / 0.005))
+T_test = np.array([1e-4, 1e-3, 1e-2])
+
+
+def test_result_key():
+    key = pnut.result_key(sn, detector, 0)
+    assert key == pnut.result_key(sn, detector, 0)
+    assert key != pnut.result_key(sn, detector, 1)
+    assert key != pnut.result_key(sn.at_distance(2 * distance), detector, 0)
+    far = sn.at_distance(2 * distance)
+    assert pnut.result_key(sn, scope="progenitor") == pnut.result_key(
+        far, scope="progenitor"
+    )
+
+
+def test_load_model():
+    assert pnut.load_model(sn) is pnut.load_model(sn.at_distance(2 * distance))
+
+
+def test_set_model_cache_size():
+    size = pnut.model_cache_size
+    pnut.set_model_cache_size(2)
+    assert pnut._load_model.cache_info().maxsize == 2
+    pnut.set_model_cache_size(size)
+    assert pnut._load_model.cache_info().maxsize == size
+
 
 def test_get_luminosities():
     lum = pnut.get_luminosities(sn)
@@ -31,7 +62,51 @@ def test_get_fluences():
         "aNuTau",
     ]
     assert len(fluences["E"]) == 501
-    assert fluences["NuTau"][0] == 3.78587055e09
+    assert np.isclose(fluences["NuTau"][0], 3.78587055e09, rtol=1e-6)
+
+
+def test_fluence_store():
+    store = pnut.fluence_store(sn)
+    assert store.shape == (sn.t_bins, 501, len(pnut.flu_names))
+    assert np.array_equal(store[0], pnut.get_fluences(sn).to_numpy())
+    assert pnut.fluence_path(sn).startswith(pnut.result_path("fluence", ""))
+    assert pnut.fluence_path(sn) != pnut.fluence_path(sn.at_distance(2 * distance))
+
+
+def test_distance_rescaling():
+    far = sn.at_distance(2 * pnut.reference_distance)
+    assert pnut.rescaled(far)
+    assert pnut.distance_scale(far) == 0.25
+    ref = pnut.fluence_store(sn.at_distance(pnut.reference_distance))
+    assert np.allclose(pnut.fluence_store(far)[:, :, 1:], ref[:, :, 1:] / 4)
+    near = Supernova(model, progenitor, transformation, 2.0, rescale=False)
+    assert not pnut.rescaled(near)
+
+
+def test_time_weights():
+    # Samples stand for [0, 0.5], [0.5, 2], [2, 3.5], and [3.5, 4].
+    t = np.array([0.0, 1.0, 3.0, 4.0])
+    ts = np.array([-1.0, 0.0, 1.0, 0.25, 2.0, 1.0])
+    te = np.array([4.0, 2.0, 2.0, 0.5, 3.0, 5.0])
+    W = pnut.time_weights(t, ts, te)
+    expected = [
+        [0.5, 1.5, 1.5, 0.5],
+        [0.5, 1.5, 0.0, 0.0],
+        # Bins inside one interval and ending on its edge.
+        [0.0, 1.0, 0.0, 0.0],
+        [0.25, 0.0, 0.0, 0.0],
+        [0.0, 0.0, 1.0, 0.0],
+        [0.0, 1.0, 1.5, 0.5],
+    ]
+    assert np.allclose(W, expected)
+
+
+def test_model_fluences():
+    # Fluences are linear in the time weights: bins add up to the whole window.
+    sn_t = Supernova(model, progenitor, transformation, distance, t_bins=3)
+    store = pnut.model_fluences(sn_t)
+    whole = pnut.model_fluences(sn)
+    assert np.allclose(store[:, :, 1:].sum(axis=0), whole[0, :, 1:], rtol=1e-10)
 
 
 def test_snowglobes_events():
@@ -49,6 +124,36 @@ def test_snowglobes_events():
     assert snow_events["smeared_weighted_0"]["Energy"][199] == 0.09975
 
 
+def test_native_tables():
+    header, tables = pnut.native_tables(sn, detector)
+    snow_events = pnut.snowglobes_events(sn, detector)
+    for key in tables:
+        df = snow_events[f"{key}_0"]
+        assert list(df.keys()) == header
+        assert np.allclose(tables[key][0], df.to_numpy(), rtol=1e-6, atol=1e-12)
+
+
+def test_batch_totals():
+    specs = [
+        {"model": model, "progenitor": progenitor, "distance": d}
+        for d in [distance, 2 * distance, distance]
+    ]
+    df = pnut.batch_totals(specs)
+    assert list(df.columns) == [
+        "model",
+        "mass",
+        "metal",
+        "t_rev",
+        "distance",
+        "transform",
+        "detector",
+        "channel",
+        "events",
+    ]
+    near = df[df["distance"] == distance]
+    assert len(near) == 2 * len(pnut.vis_totals(sn, detector))
+
+
 def test_sspike_events():
     key_list = ["basic_0", "elastic_0"]
     column_list = [
@@ -72,3 +177,137 @@ def test_sspike_events():
 
     assert isclose(sspike_events["elastic_0"]["E_vis"][0], E0, rel_tol=close)
     assert isclose(sspike_events["elastic_0"]["E_vis"][174], E174, rel_tol=close)
+
+
+def test_nc_grid_events():
+    for mode in pnut.nc_modes:
+        N = pnut.nc_grid_events(T_test, E_flu, f_flu, mode=mode)[:, 0]
+        for i, T_p in enumerate(T_test):
+            E_min = pnut.nc_threshold(T_p)
+            N_quad = pnut.nc_events(T_p, E_flu, f_flu, E_min)
+            assert isclose(N[i], N_quad, rel_tol=1e-4)
+
+
+def test_nc_analytic_events():
+    N = pnut.nc_analytic_events(T_test, E_flu, f_flu)[:, 0]
+    N_grid = pnut.nc_grid_events(T_test, E_flu, f_flu, mode="accurate")[:, 0]
+    for i in range(len(T_test)):
+        assert isclose(N[i], N_grid[i], rel_tol=1e-10)
+
+
+def test_nc_response():
+    R = pnut.nc_response(T_test, E_flu)
+    N = pnut.nc_analytic_events(T_test, E_flu, f_flu)[:, 0]
+    assert R.shape == (len(T_test), len(E_flu))
+    assert np.allclose(R @ f_flu, N, rtol=1e-10)
+
+
+def test_smeared_bins():
+    data = np.array([pnut.snow_energy(), np.ones(200)])
+    tables = {"header": None}
+    for i in range(2):
+        for key in ["unsmeared_weighted", "smeared_weighted"]:
+            tables[f"flu_{i}_kamland_events_{key}.dat"] = {
+                "header": "Energy ibd",
+                "data": data * (i + 1),
+            }
+    header, energy, bins = pnut._smeared_bins(tables, detector, indices=[4, 7])
+    assert header == ["Energy", "ibd"]
+    assert list(bins) == [4, 7]
+    assert bins[7][1].sum() == 400
+
+    # snewpy names the file of a single time bin without an index.
+    file = "flu-shard2_kamland_events_smeared_weighted.dat"
+    single = {"header": None, file: {"header": "Energy ibd", "data": data}}
+    _, _, bins = pnut._smeared_bins(single, detector, indices=[2])
+    assert list(bins) == [2]
+
+
+def test_sharded_bins():
+    # The second shard holds a single time bin.
+    sn_t = Supernova(model, progenitor, transformation, distance, t_bins=3)
+    header, energy, bins = pnut._sharded_bins(sn_t, detector, jobs=2)
+    assert sorted(bins) == [0, 1, 2]
+    assert len(energy) == len(pnut.snow_energy())
+    serial = pnut.time_events(sn_t, detector, engine="native")
+    for index, data in bins.items():
+        ibd = data[header.index("ibd")]
+        assert np.allclose(ibd, serial["ibd"].iloc[index], rtol=1e-6, atol=1e-12)
+
+
+def test_elastic_time_events():
+    sn_t = Supernova(model, progenitor, transformation, distance, t_bins=2)
+    counts = pnut.elastic_time_events(sn_t, detector, save=False)
+    assert list(counts.keys()) == list(pnut.nc_flavors) + ["nc_p"]
+    assert counts["nc_p"].shape == (2, len(pnut.recoil_energy()))
+
+
+def test_stream_time_events():
+    sn_t = Supernova(model, progenitor, transformation, distance, t_bins=5)
+    counts = pnut.time_events(sn_t, detector, engine="native")
+    stream = pnut.stream_time_events(sn_t, detector, block=2, save=False)
+    for index, t, events in stream:
+        assert np.allclose(events["ibd"], counts["ibd"].iloc[index])
+        assert np.allclose(events["nc_p"], counts["nc_p"].iloc[index])
+    assert index == 4
+
+    # SNOwGLoBES blocks of 2, 2, and a single time bin.
+    stream = pnut.stream_time_events(sn_t, detector, "snewpy", block=2, save=False)
+    for index, t, events in stream:
+        ibd = counts["ibd"].iloc[index]
+        assert np.allclose(events["ibd"], ibd, rtol=1e-6, atol=1e-12)
+    assert index == 4
+
+
+def test_rebinned_time_events():
+    dt = (sn.t_max - sn.t_min) / pnut.base_t_bins
+    for sn_t in [sn.with_bins(10), sn.with_bins(4, sn.t_min, sn.t_min + 40 * dt)]:
+        counts = pnut.rebinned_time_events(sn_t, detector, save=False)
+        direct = pnut.time_events(sn_t, detector, engine="native")
+        for chan in ["ibd", "nc_p"]:
+            assert np.allclose(counts[chan], direct[chan])
+
+    # Streaming the base bins and stopping early leaves the cached cube intact.
+    base = sn.with_bins(pnut.base_t_bins).at_distance(pnut.reference_distance)
+    next(pnut.stream_time_events(base, detector))
+    sn_t = sn.with_bins(10)
+    counts = pnut.rebinned_time_events(sn_t, detector, save=False)
+    direct = pnut.time_events(sn_t, detector, engine="native")
+    assert np.allclose(counts["ibd"], direct["ibd"])
+
+
+def test_get_xscn():
+    xs = pnut.get_xscn("ibd")
+    assert xs.shape == (len(pnut.xs_flavors), len(pnut.snow_energy()))
+    assert pnut.get_xscn("ibd") is xs
+
+
+def test_birks_quench():
+    T_p = pnut.recoil_energy()
+    assert np.allclose(pnut.birks_quench(T_p, 0), T_p)
+    E = pnut.birks_quench(T_p, np.array([0.005, 0.01, 0.02]))
+    assert E.shape == (3, len(T_p))
+    assert np.all(E[0] > E[1]) and np.all(E[1] > E[2])
+    assert np.allclose(pnut.quench(T_p, "birks", 0.01), E[1])
+
+
+def test_snowglobes_tree(tmp_path, monkeypatch):
+    shared = f"{tmp_path}/snowglobes"
+    for name in ["fluxes", "out", "smear"]:
+        makedirs(f"{shared}/{name}")
+    with open(f"{shared}/supernova.glb", "w") as glb:
+        glb.write("shared")
+    monkeypatch.setattr(pnut, "snowglobes_dir", shared)
+    monkeypatch.setattr(pnut, "cache_dir", f"{tmp_path}/cache")
+
+    tree = pnut._snowglobes_tree(-1)
+    assert tree.startswith(f"{tmp_path}/cache/")
+    assert path.islink(f"{tree}/smear")
+    for name in ["fluxes", "out", "supernova.glb"]:
+        assert not path.islink(f"{tree}/{name}")
+    # Writes in the tree leave the shared directory untouched.
+    with open(f"{tree}/supernova.glb", "w") as glb:
+        glb.write("local")
+    with open(f"{shared}/supernova.glb") as glb:
+        assert glb.read() == "shared"
+    pnut._snowglobes_tree.cache_clear()
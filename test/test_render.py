@@ -0,0 +1,28 @@
+import json
+
+from sspike import render
+from sspike.stages import stages
+
+run = ("Nakazato_2013", {"mass": 20}, "NoTransformation", 5.0, "kamland")
+
+
+def test_enqueue(tmp_path):
+    path = tmp_path / "queue.jsonl"
+    render.enqueue("bar_vis", run, path)
+    render.enqueue("bar_totals", run, path)
+
+    tasks = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [task["plot"] for task in tasks] == ["bar_vis", "bar_totals"]
+    assert tasks[0]["run"] == list(run)
+
+
+def test_drain_empty(tmp_path):
+    assert render.drain(path=tmp_path / "queue.jsonl") == 0
+
+
+def test_stage_plots():
+    # Every plot named by a stage is a plotting function of beer.
+    from sspike import beer
+
+    plots = [stage.plot for stage in stages.values() if stage.plot]
+    assert all(callable(getattr(beer, plot)) for plot in plots)
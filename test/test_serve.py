@@ -0,0 +1,35 @@
+from http.server import HTTPServer
+from threading import Thread
+from urllib.error import HTTPError
+from urllib.request import urlopen
+import json
+
+import pytest
+
+from sspike import serve
+
+
+def test_rates_validation():
+    with pytest.raises(ValueError, match="Missing"):
+        serve.rates({"model": "Nakazato_2013"})
+    with pytest.raises(ValueError, match="Unknown"):
+        serve.rates({"model": "Nakazato_2013", "progenitor": {}, "mass": 20})
+    with pytest.raises(ValueError, match="Unknown model"):
+        serve.rates({"model": "Nakazato_2031", "progenitor": {}})
+    with pytest.raises(ValueError, match="Unknown transformation"):
+        serve.rates({"model": "Nakazato_2013", "progenitor": {}, "transform": "x"})
+
+
+def test_bad_query_status():
+    server = HTTPServer(("127.0.0.1", 0), serve.RateHandler)
+    Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/rates"
+    query = json.dumps({"model": "Nakazato_2031", "progenitor": {}}).encode()
+    try:
+        with pytest.raises(HTTPError) as err:
+            urlopen(url, data=query)
+        assert err.value.code == 400
+        assert "Unknown model" in json.load(err.value)["error"]
+    finally:
+        server.shutdown()
+        server.server_close()
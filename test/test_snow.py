@@ -0,0 +1,27 @@
+import numpy as np
+
+from sspike import snow
+
+
+def test_interp_matrix():
+    x = np.linspace(0, 1, 11)
+    y = x ** 2
+    x_new = np.array([-0.5, 0.0, 0.33, 0.5, 1.0, 1.5])
+    M = snow._interp_matrix(x_new, x)
+    assert np.allclose(M @ y, np.interp(x_new, x, y, left=0, right=0))
+
+
+def test_SnowEngine():
+    engine = snow.get_engine("kamland", "scint")
+    assert engine is snow.get_engine("kamland", "scint")
+    assert len(engine.energy) == 200
+
+    E = np.linspace(0, 0.1, 501)
+    F = np.ones((3, len(E), 6))
+    events = engine.rates(E, F)
+    for key in events:
+        assert events[key].shape == (3, 200, len(engine.channels))
+
+    header, tables = engine.collate(events)
+    assert header == ["Energy", "ibd", "nue_C12", "nue_C13", "nuebar_C12", "nc", "e"]
+    assert tables["smeared_weighted"].shape == (3, 200, len(header))
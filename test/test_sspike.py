@@ -1,5 +1,7 @@
 import subprocess
 
+from sspike.sspike import run_sweep
+
 
 def test_sspike():
     # Run Nakazato model from command line.
@@ -24,3 +26,15 @@ def test_sspike():
     )
 
     assert subprocess.check_output(sspike_com) == output
+
+
+def test_run_sweep():
+    # Unknown models fail inside the workers without stopping the sweep.
+    runs = [
+        ("Unknown_2000", {"mass": 20}, "NoTransformation", d, "kamland")
+        for d in [10.0, 5.0]
+    ]
+    summary = run_sweep(runs, 2)
+    assert list(summary["distance"]) == [10.0, 5.0]
+    assert (summary["status"] == "failed").all()
+    assert summary["error"].str.startswith("AttributeError").all()
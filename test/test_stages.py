@@ -0,0 +1,30 @@
+import pytest
+
+from sspike import stages
+
+progenitor = {"mass": 20, "metal": 0.02, "t_rev": 300}
+runs = [
+    ("Nakazato_2013", progenitor, "NoTransformation", distance, detector)
+    for distance in [10.0, 5.0]
+    for detector in ["kamland", "scint20kt"]
+]
+
+
+def test_required():
+    assert stages.required() == list(stages.stages)
+    assert stages.required("totals") == ["fluence", "snowglobes", "sspike", "totals"]
+    with pytest.raises(ValueError):
+        stages.required("plots")
+
+
+def test_plan():
+    nodes = stages.plan(runs)
+    names = [name for _, name, _ in nodes]
+    # One luminosity, a fluence per distance, and detector stages per run.
+    assert names.count("luminosity") == 1
+    assert names.count("fluence") == 2
+    assert names.count("vis") == 4
+    assert names.index("totals") > names.index("sspike")
+
+    nodes = stages.plan(runs, until="fluence")
+    assert [name for _, name, _ in nodes] == ["fluence", "fluence"]
@@ -28,6 +28,13 @@ def test_bin_times():
         assert str(t.unit) == "s"
 
 
+def test_with_bins():
+    fine = sn.with_bins(10, 0.0, 1.0)
+    assert (fine.t_bins, fine.t_start, fine.t_end) == (10, 0.0, 1.0)
+    assert fine.bin_name == "b10s0.0e1.0"
+    assert sn.with_bins(5).t_start == sn.t_min
+
+
 def test_random_df():
     df = sn.random_df()
     keys = list(df.keys())